@@ -0,0 +1,260 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import requests
+
+from bazaar_api import BazaarAPI
+from history_frame import HistoryFrame
+from indicators import IndicatorEngine
+from time_parser import TimeParser
+
+log = logging.getLogger(__name__)
+
+# Favoriten und eigene Regeln (von der Settings-Seite gepflegt)
+ALERTS_PATH = os.environ.get("BAZAAR_ALERTS", "alerts.json")
+# Standardziel für ausgelöste Alarme (eine JSON-Zeile pro Alarm)
+ALERTS_LOG = "alerts.jsonl"
+
+# Schwellen der Dashboard-Karten auf die Marge nach Steuer, in Prüfreihenfolge:
+# (Grenze in %, Stufe, Titel, Hintergrund); positive Grenze = "größer", negative = "kleiner"
+MARGIN_LEVELS = [
+    (20, "surge", "🚀 Massive Steigerung!", "rgba(0,200,0,0.7)"),
+    (10, "rise", "📈 Stark gestiegen!", "rgba(0,128,0,0.6)"),
+    (-20, "crash", "📉 Massiver Einbruch!", "rgba(200,0,0,0.7)"),
+    (-10, "fall", "⚠️ Stark gefallen!", "rgba(255,80,80,0.6)"),
+    (-5, "drop", "⚠️ Deutlicher Einbruch!", "rgba(255,120,120,0.6)"),
+]
+# Fenster der Ø-Basis (wie auf den Dashboard-Karten)
+BASELINE_WINDOW = 10
+# Felder, auf die eigene Regeln zugreifen dürfen
+RULE_FIELDS = ("margin_after_tax", "margin", "sell", "buy")
+
+
+def classify(pct: float):
+    """Stufe der prozentualen Abweichung: (Stufe, Titel, Farbe) oder None."""
+    for limit, level, title, color in MARGIN_LEVELS:
+        if (limit > 0 and pct > limit) or (limit < 0 and pct < limit):
+            return level, title, color
+    return None
+
+
+def load_config(path: str = ALERTS_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            config = json.load(fh)
+    except FileNotFoundError:
+        config = {}
+    config.setdefault("favorites", [])
+    config.setdefault("rules", [])
+    return config
+
+
+def save_config(config: dict, path: str = ALERTS_PATH):
+    # Erst in eine Temp-Datei, dann umbenennen: Leser sehen nie eine halbe Datei
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(config, fh, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# --- Ausgabeziele ---
+class LogSink:
+    def emit(self, alert: dict):
+        log.warning("%s %s: %s", alert["item"], alert["title"], alert["message"])
+
+
+class FileSink:
+    def __init__(self, path: str = ALERTS_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, alert: dict):
+        line = json.dumps(alert, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+class WebhookSink:
+    """Sendet Alarme im eigenen Thread, damit ein langsamer Endpunkt den Collector nicht bremst."""
+
+    def __init__(self, url: str, timeout: float = 5, maxsize: int = 1000):
+        self.url = url
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        threading.Thread(target=self._run, name="alert-webhook", daemon=True).start()
+
+    def emit(self, alert: dict):
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            log.error("Webhook-Warteschlange voll, Alarm verworfen: %s %s", alert["item"], alert["title"])
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            try:
+                requests.post(self.url, json=alert, timeout=self.timeout).raise_for_status()
+            except requests.RequestException:
+                log.exception("Webhook fehlgeschlagen: %s", self.url)
+
+
+class AlertEngine:
+    """Prüft Schwellen und eigene Regeln bei jedem neuen Tick, ohne Streamlit.
+
+    Die Basiswerte kommen aus einem eigenen ``IndicatorEngine`` (nur neue Ticks
+    werden nachgeschoben); jeder neue Tick wird einzeln und in zeitlicher
+    Reihenfolge geprüft, auch wenn ein Poll mehrere auf einmal bringt. Beim
+    ersten Kontakt mit einer Reihe zählt nur der letzte Tick. Gleiche Alarme
+    (Item, Regel, Stufe) werden innerhalb von ``cooldown`` Sekunden nur einmal
+    gemeldet.
+    """
+
+    def __init__(self, api: BazaarAPI = None, sinks=None, cooldown: float = 900,
+                 config_path: str = ALERTS_PATH):
+        self.api = api or BazaarAPI()
+        self.sinks = sinks if sinks is not None else [LogSink()]
+        self.cooldown = cooldown
+        self.config_path = config_path
+        # Eigene Instanz: die geteilte wird auch vom Dashboard gefüttert, dessen Ticks
+        # hier sonst nie ankämen
+        self.indicators = IndicatorEngine()
+        self._primed = set()        # (item, periode, feld), bereits einmal eingespeist
+        self._rules = {}            # item -> [Regel]
+        self._config_mtime = None
+        self._config_checked = 0.0
+        self._last = {}             # (item, regel, stufe) -> Zeitpunkt der letzten Meldung
+        self._lock = threading.Lock()
+
+    def rules_for(self, item: str) -> list:
+        self._reload_config()
+        return self._rules.get(item, [])
+
+    def _reload_config(self):
+        # Höchstens einmal pro Sekunde auf die Platte schauen, auch bei tausenden Items
+        now = time.monotonic()
+        if now - self._config_checked < 1.0:
+            return
+        self._config_checked = now
+        try:
+            mtime = os.stat(self.config_path).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._config_mtime:
+            return
+        rules = {}
+        for rule in load_config(self.config_path)["rules"]:
+            rules.setdefault(rule["item"], []).append(rule)
+        with self._lock:
+            self._rules, self._config_mtime = rules, mtime
+
+    def on_ticks(self, item: str, period: str):
+        """Collector-Listener: frische Ticks aus dem Speicher lesen und prüfen."""
+        self.evaluate(item, period, self.api.store.load(item, period))
+
+    def _steps(self, item: str, period: str, field: str, frame: HistoryFrame) -> list:
+        """(ts, Wert, Ø vorher, Abweichung %) je neu eingespeistem Tick, älteste zuerst."""
+        steps = []
+        self.indicators.feed(item, period, field, frame, window=BASELINE_WINDOW,
+                             on_push=lambda state: steps.append((state.last_ts, state.last, state.baseline[0], state.pct)))
+        key = (item, period, field)
+        with self._lock:
+            primed = key in self._primed
+            self._primed.add(key)
+        # Erster Kontakt: nicht die ganze Historie nachmelden
+        return steps if primed else steps[-1:]
+
+    def evaluate(self, item: str, period: str, frame: HistoryFrame, now: float = None) -> list:
+        if not frame:
+            return []
+        now = time.time() if now is None else now
+        alerts = []
+        rules = self.rules_for(item)
+        # Jedes Feld genau einmal einspeisen: ein zweiter Aufruf fände keine neuen Ticks mehr
+        fields = dict.fromkeys(["margin_after_tax"] + [rule["field"] for rule in rules])
+        steps = {field: self._steps(item, period, field, frame) for field in fields}
+
+        for ts, last, avg, pct in steps["margin_after_tax"]:
+            hit = classify(pct)
+            if hit is not None:
+                level, title, _ = hit
+                alerts.append(self._alert(
+                    now, ts, item, period, "margin", level, title, last, pct,
+                    f"Ø vorher: {avg:,.1f}  Aktuell: {last:,.1f}  ∆: {pct:+.1f}%"
+                ))
+
+        for rule in rules:
+            field = rule["field"]
+            pct_mode = rule.get("mode") == "pct"
+            unit = "%" if pct_mode else ""
+            threshold = float(rule["value"])
+            for ts, last, _, pct in steps[field]:
+                value = pct if pct_mode else last
+                if (rule["op"] == ">" and value > threshold) or (rule["op"] == "<" and value < threshold):
+                    alerts.append(self._alert(
+                        now, ts, item, period, rule["id"], rule["op"],
+                        f"Regel {field} {rule['op']} {threshold:g}{unit}",
+                        value, None, f"{field} = {value:,.1f}{unit}"
+                    ))
+
+        # Zeitliche Reihenfolge: bei Abklingzeit wird der früheste Treffer gemeldet
+        alerts.sort(key=lambda a: a["tick"])
+        fired = [a for a in alerts if self._should_emit(a, now)]
+        for alert in fired:
+            for sink in self.sinks:
+                sink.emit(alert)
+        return fired
+
+    @staticmethod
+    def _alert(now, ts, item, period, rule, level, title, value, pct, message) -> dict:
+        return {
+            "time": TimeParser.from_epoch(now),
+            "tick": TimeParser.from_epoch(ts),
+            "item": item,
+            "period": period,
+            "rule": rule,
+            "level": level,
+            "title": title,
+            "value": value,
+            "pct": pct,
+            "message": message,
+        }
+
+    def _should_emit(self, alert: dict, now: float) -> bool:
+        key = (alert["item"], alert["rule"], alert["level"])
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.cooldown:
+                return False
+            self._last[key] = now
+            return True
+
+
+if __name__ == "__main__":
+    # Headless: python alerts.py [--webhook URL] [ITEM ...]
+    from collector import Collector
+
+    parser = argparse.ArgumentParser(description="Alarme für die Watchlist ohne Streamlit")
+    parser.add_argument("items", nargs="*", help="Items (Standard: Favoriten und Regel-Items)")
+    parser.add_argument("--jsonl", default=ALERTS_LOG, help="Datei für ausgelöste Alarme")
+    parser.add_argument("--webhook", help="URL, an die jeder Alarm als JSON gesendet wird")
+    parser.add_argument("--cooldown", type=float, default=900)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    config = load_config()
+    items = args.items or sorted(set(config["favorites"]) | {r["item"] for r in config["rules"]})
+    sinks = [LogSink(), FileSink(args.jsonl)] + ([WebhookSink(args.webhook)] if args.webhook else [])
+    collector = Collector()
+    collector.subscribe(AlertEngine(collector.api, sinks, args.cooldown).on_ticks)
+    collector.track(items or ["BOOSTER_COOKIE"])
+    collector.start()
+    try:
+        while collector.is_alive():
+            collector.join(1)
+    except KeyboardInterrupt:
+        collector.stop()
@@ -0,0 +1,45 @@
+import gzip
+import hashlib
+import json
+import os
+from urllib.parse import urlsplit
+
+# Parameter, die sich bei jedem Aufruf ändern (Zeitbereich) – nicht Teil des Schlüssels
+VOLATILE_PARAMS = ("start", "end")
+
+
+class ResponseArchive:
+    """Upstream-Antworten als gzip-JSON auf der Platte, eine Datei pro Anfrage.
+
+    Schlüssel ist der URL-Pfad (ohne Host) plus die stabilen Parameter; so
+    lassen sich Aufnahmen gegen einen anderen Host (Stub, Spiegel) abspielen.
+    Bereichsabfragen überschreiben sich gegenseitig – abgespielt wird die
+    zuletzt aufgenommene Antwort.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: dict = None) -> str:
+        stable = sorted((k, str(v)) for k, v in (params or {}).items() if k not in VOLATILE_PARAMS)
+        raw = json.dumps([urlsplit(url).path, stable])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _file(self, url: str, params: dict = None) -> str:
+        return os.path.join(self.path, f"{self.key(url, params)}.json.gz")
+
+    def save(self, url: str, params: dict, body):
+        tmp = self._file(url, params) + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            json.dump({"url": url, "params": params, "body": body}, fh, separators=(",", ":"))
+        os.replace(tmp, self._file(url, params))
+
+    def load(self, url: str, params: dict = None):
+        """Aufgenommene Antwort oder ``KeyError``, wenn es keine gibt."""
+        try:
+            with gzip.open(self._file(url, params), "rt", encoding="utf-8") as fh:
+                return json.load(fh)["body"]
+        except FileNotFoundError:
+            raise KeyError(url) from None
@@ -0,0 +1,126 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from forecast_engine import ForecastEngine, fit_ewma, fit_holt, fit_trend
+from history_store import HISTORY_DB_PATH, PERIOD_STEP, HistoryStore
+from price_panel import to_grid
+
+# Ursprünge pro Block; begrenzt den Speicher der Fenster-Matrix
+BLOCK = 4096
+# Quantile der Empfehlungsregel (wie in Recommendations)
+LOW_Q, HIGH_Q = 0.05, 0.95
+
+
+def _windows(y: np.ndarray, window: int, horizon: int):
+    """Fenster (Ursprünge × window) und Zielwert ``horizon`` Schritte nach Fensterende."""
+    if len(y) < window + horizon:
+        return np.empty((0, window)), np.empty(0)
+    win = sliding_window_view(y, window)[:len(y) - window - horizon + 1]
+    return win, y[window - 1 + horizon:]
+
+
+def _trend(y: np.ndarray, horizon: int) -> np.ndarray:
+    # Rasterschritte relativ zum Ursprung; Fenster liegen als Spalten vor
+    x = np.arange(-(len(y) - 1), 1, dtype=np.float64)
+    slope, intercept = fit_trend(x, y)
+    return slope * horizon + intercept
+
+
+def _ewma(y: np.ndarray, horizon: int) -> np.ndarray:
+    return fit_ewma(y, ForecastEngine.EWMA_ALPHA)
+
+
+def _holt(y: np.ndarray, horizon: int) -> np.ndarray:
+    level, trend = fit_holt(y, ForecastEngine.HOLT_ALPHA, ForecastEngine.HOLT_BETA)
+    return level + trend * horizon
+
+
+# Dieselben Schätzer wie im ForecastEngine, nur über Ursprünge statt Items gestapelt
+FORECASTERS = {"Trend": _trend, "EWMA": _ewma, "Holt": _holt}
+
+
+def evaluate_forecasts(y: np.ndarray, window: int, horizon: int) -> pd.DataFrame:
+    """Rolling-Origin-Auswertung: MAE, MAPE und Fits pro Sekunde je Modell."""
+    win, target = _windows(y, window, horizon)
+    errors, elapsed = {}, {}
+    for lo in range(0, len(win), BLOCK):
+        block = win[lo:lo + BLOCK].T
+        for model, forecaster in FORECASTERS.items():
+            started = time.perf_counter()
+            pred = forecaster(block, horizon)
+            elapsed[model] = elapsed.get(model, 0.0) + time.perf_counter() - started
+            errors.setdefault(model, []).append(pred - target[lo:lo + BLOCK])
+    rows = {}
+    for model, parts in errors.items():
+        err = np.concatenate(parts)
+        t = target[:len(err)]
+        ok = ~np.isnan(err) & (t != 0)
+        rows[model] = {
+            "MAE": np.abs(err[ok]).mean() if ok.any() else np.nan,
+            "MAPE %": (np.abs(err[ok]) / np.abs(t[ok])).mean() * 100 if ok.any() else np.nan,
+            "Ursprünge": int(ok.sum()),
+            "Fits/s": len(err) / elapsed[model] if elapsed[model] else np.nan,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def evaluate_signals(y: np.ndarray, window: int, horizon: int) -> pd.DataFrame:
+    """Trefferquote der Quantil-Regel: Kaufen → Preis steigt, Verkaufen → Preis fällt."""
+    win, target = _windows(y, window, horizon)
+    parts, started = [], time.perf_counter()
+    for lo in range(0, len(win), BLOCK):
+        block = win[lo:lo + BLOCK]
+        low, high = np.nanquantile(block, [LOW_Q, HIGH_Q], axis=1)
+        parts.append((block[:, -1], low, high))
+    spent = time.perf_counter() - started
+    if not parts:
+        return pd.DataFrame(columns=["Signale", "Trefferquote %", "Auswertungen/s"])
+    latest, low, high = (np.concatenate(p) for p in zip(*parts))
+    move = target - latest
+    rows = {}
+    for name, fired, hit in (
+        ("Kaufen", latest <= low, move > 0),
+        ("Verkaufen", latest >= high, move < 0),
+    ):
+        fired &= ~np.isnan(move)
+        rows[name] = {
+            "Signale": int(fired.sum()),
+            "Trefferquote %": hit[fired].mean() * 100 if fired.any() else np.nan,
+            "Auswertungen/s": len(win) / spent if spent else np.nan,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def run(store: HistoryStore, items, period: str = "hour", window: int = 360,
+        horizon_s: float = 600, field: str = "sell"):
+    """Backtest über alle gespeicherten Ticks der ``items`` (offline, ohne API)."""
+    horizon = max(1, int(horizon_s // PERIOD_STEP[period]))
+    forecasts, signals = {}, {}
+    for item in items:
+        _, y = to_grid(store.load_all(item, period), period, field)
+        forecasts[item] = evaluate_forecasts(y, window, horizon)
+        signals[item] = evaluate_signals(y, window, horizon)
+    return (pd.concat(forecasts, names=["Item", "Modell"]),
+            pd.concat(signals, names=["Item", "Signal"]))
+
+
+if __name__ == "__main__":
+    # Offline-Auswertung: python backtest.py [--period hour] [--window 360] [ITEM ...]
+    parser = argparse.ArgumentParser(description="Rolling-Origin-Backtest aus history.db")
+    parser.add_argument("items", nargs="*", help="Items (Standard: alle gespeicherten)")
+    parser.add_argument("--db", default=HISTORY_DB_PATH)
+    parser.add_argument("--period", default="hour", choices=sorted(PERIOD_STEP))
+    parser.add_argument("--window", type=int, default=360, help="Fensterlänge in Rasterschritten")
+    parser.add_argument("--horizon", type=float, default=600, help="Horizont in Sekunden")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    items = args.items or store.items(args.period)
+    fc, sig = run(store, items, args.period, args.window, args.horizon)
+    with pd.option_context("display.width", 160, "display.max_rows", None):
+        print("Forecasts\n", fc.round(3), "\n")
+        print("Signale\n", sig.round(2))
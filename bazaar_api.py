@@ -1,16 +1,211 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from api_cache import TTLCache
+from api_recorder import ResponseArchive
+from history_frame import HistoryFrame
+from history_store import HistoryStore, PERIOD_SECONDS, PERIOD_STEP
+from instrumentation import SIZE_BUCKETS, Metrics
+from time_parser import TimeParser
+
+# Cache-Lebensdauer in Sekunden je History-Periode
+HISTORY_TTL = {"hour": 10, "day": 60, "week": 300}
+ORDERS_TTL = 30
+QUOTE_TTL = 10
+# Produktkatalog ändert sich selten
+ITEMS_TTL = 3600
+# Lokaler Tick gilt als aktueller Kurs, wenn er höchstens so alt ist (Sekunden)
+QUOTE_MAX_AGE = 60
+# Parallele Upstream-Anfragen (gleichzeitig Größe des Verbindungspools)
+MAX_WORKERS = 16
+
+# Upstream-Wurzel; für den lokalen Stub z. B. http://127.0.0.1:8099/api
+API_ROOT = os.environ.get("BAZAAR_API_ROOT", "https://sky.coflnet.com/api").rstrip("/")
+# Verzeichnisse für Aufnahme bzw. Wiedergabe der Upstream-Antworten (siehe api_recorder.py)
+RECORD_DIR = os.environ.get("BAZAAR_RECORD")
+REPLAY_DIR = os.environ.get("BAZAAR_REPLAY")
+# Künstliche Latenz pro abgespielter Antwort in Sekunden
+REPLAY_LATENCY = float(os.environ.get("BAZAAR_REPLAY_LATENCY", "0"))
+
+
+def _endpoint(url: str) -> str:
+    """Metrik-Label ohne Item/Spieler, damit die Label-Anzahl begrenzt bleibt."""
+    parts = urlsplit(url).path.rstrip("/").split("/")
+    if "player" in parts:
+        return "orders"
+    if parts[-1] == "snapshot":
+        return "snapshot"
+    if parts[-1] == "history":
+        return "history_range"
+    if len(parts) > 1 and parts[-2] == "history":
+        return f"history_{parts[-1]}"
+    if parts[-1] == "tags":
+        return "items"
+    return parts[-1]
+
+
+def _cache_gauges(metrics: Metrics):
+    for name, value in BazaarAPI.cache_stats().items():
+        metrics.set("bazaar_cache", value, stat=name)
+
+
+def _make_session() -> requests.Session:
+    # Keep-Alive-Session: TCP/TLS-Handshake nur einmal pro Verbindung
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class BazaarAPI:
-    BASE_URL = "https://sky.coflnet.com/api/bazaar"
+    BASE_URL = f"{API_ROOT}/bazaar"
+    ITEMS_URL = f"{API_ROOT}/items/bazaar/tags"
+    # Prozessweit geteilt: alle Instanzen und Streamlit-Sessions nutzen denselben Cache
+    cache = TTLCache(maxsize=512)
+    # Wird vom Collector gesetzt, sobald er läuft (siehe collector.py)
+    collector = None
+    session = _make_session()
+    recorder = ResponseArchive(RECORD_DIR) if RECORD_DIR else None
+    replay = ResponseArchive(REPLAY_DIR) if REPLAY_DIR else None
+    pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="bazaar-api")
+    metrics = Metrics.shared()
 
-    def get_history(self, item: str, period: str = "hour") -> list:
-        url = f"{self.BASE_URL}/{item}/history/{period}"
-        resp = requests.get(url)
+    def __init__(self, store: HistoryStore = None):
+        self.store = store or HistoryStore.shared()
+
+    def get_history(self, item: str, period: str = "hour") -> HistoryFrame:
+        self.metrics.inc("bazaar_api_calls_total", method="get_history")
+        return self.cache.get_or_load(
+            ("history", item, period), HISTORY_TTL[period],
+            lambda: self._load_history(item, period)
+        )
+
+    def _load_history(self, item: str, period: str) -> HistoryFrame:
+        collector = self.collector
+        if collector is not None and collector.is_alive():
+            # Collector pollt das Item ab jetzt; Seiten lesen nur noch lokal
+            collector.track([item], period)
+            if self.store.last_sync(item, period) is None:
+                self.sync_history(item, period)
+        else:
+            # Nur neue Ticks nachladen, gelesen wird immer aus dem lokalen Speicher
+            self.sync_history(item, period)
+        return self.store.load(item, period)
+
+    def get_history_many(self, items, period: str = "hour") -> dict:
+        """History mehrerer Items parallel abrufen: {item: HistoryFrame}."""
+        items = list(dict.fromkeys(items))
+        results = self.pool.map(lambda it: self.get_history(it, period), items)
+        return dict(zip(items, results))
+
+    def get_latest_quote(self, item: str) -> dict:
+        """Letzter Kurs {'buy', 'sell', 'timestamp'} ohne die ganze History zu laden."""
+        self.metrics.inc("bazaar_api_calls_total", method="get_latest_quote")
+        return self.cache.get_or_load(
+            ("quote", item), QUOTE_TTL, lambda: self._load_quote(item)
+        )
+
+    def get_latest_quotes(self, items) -> dict:
+        """Letzte Kurse mehrerer Items parallel: {item: quote}."""
+        items = list(dict.fromkeys(items))
+        return dict(zip(items, self.pool.map(self.get_latest_quote, items)))
+
+    def _load_quote(self, item: str) -> dict:
+        # Frischer Tick aus dem Speicher (z. B. vom Collector) spart den HTTP-Call
+        last_sync = self.store.last_sync(item, "hour")
+        if last_sync is not None and time.time() - last_sync < QUOTE_MAX_AGE:
+            quote = self.store.latest(item, "hour")
+            if quote is not None:
+                return quote
+        data = self._get_json(f"{self.BASE_URL}/{item}/snapshot")
+        return {"buy": data.get("buyPrice"), "sell": data.get("sellPrice"),
+                "timestamp": data.get("timeStamp")}
+
+    def sync_history(self, item: str, period: str) -> int:
+        """Lädt neue Ticks in den Speicher und gibt deren Anzahl zurück."""
+        now = time.time()
+        last_sync = self.store.last_sync(item, period)
+        if last_sync is not None and now - last_sync < PERIOD_STEP[period]:
+            return 0
+        last_ts = self.store.last_timestamp(item, period)
+        if last_ts is None or now - last_ts > PERIOD_SECONDS[period]:
+            # Noch nichts oder nur veraltete Daten lokal: komplettes Fenster holen
+            return self.store.append(item, period, self._fetch_history(item, period), synced_at=now)
+        points = self._fetch_history_range(item, last_ts, now)
+        return self.store.append(item, period, points, synced_at=now, min_gap=PERIOD_STEP[period])
+
+    def _get_json(self, url: str, params: dict = None):
+        endpoint = _endpoint(url)
+        self.metrics.inc("bazaar_upstream_requests_total", endpoint=endpoint)
+        try:
+            with self.metrics.timer("bazaar_upstream_seconds", endpoint=endpoint):
+                body, size = self._request(url, params)
+        except Exception:
+            self.metrics.inc("bazaar_upstream_errors_total", endpoint=endpoint)
+            raise
+        if size is not None:
+            self.metrics.observe("bazaar_payload_bytes", size, buckets=SIZE_BUCKETS, endpoint=endpoint)
+        return body
+
+    def _request(self, url: str, params: dict = None):
+        """(JSON, Bytes auf der Leitung); bei Wiedergabe ist die Größe unbekannt."""
+        if self.replay is not None:
+            # Offline: nur Aufnahmen, nie das Netz
+            if REPLAY_LATENCY:
+                time.sleep(REPLAY_LATENCY)
+            try:
+                return self.replay.load(url, params), None
+            except KeyError:
+                raise requests.ConnectionError(f"Keine Aufnahme für {url}") from None
+        resp = self.session.get(url, params=params, timeout=15)
         resp.raise_for_status()
-        return resp.json()[::-1]
+        body = resp.json()
+        if self.recorder is not None:
+            self.recorder.save(url, params, body)
+        return body, len(resp.content)
+
+    def _fetch_history(self, item: str, period: str) -> list:
+        url = f"{self.BASE_URL}/{item}/history/{period}"
+        return self._get_json(url)[::-1]
+
+    def _fetch_history_range(self, item: str, start: float, end: float) -> list:
+        url = f"{self.BASE_URL}/{item}/history"
+        params = {"start": TimeParser.from_epoch(start), "end": TimeParser.from_epoch(end)}
+        return self._get_json(url, params)[::-1]
+
+    def get_items(self) -> list:
+        """Alle Bazaar-Produkt-IDs (Katalog)."""
+        self.metrics.inc("bazaar_api_calls_total", method="get_items")
+        return self.cache.get_or_load(
+            ("items",), ITEMS_TTL, lambda: sorted(self._get_json(self.ITEMS_URL))
+        )
 
     def get_player_orders(self, player_id: str) -> list:
+        self.metrics.inc("bazaar_api_calls_total", method="get_player_orders")
+        return self.cache.get_or_load(
+            ("orders", player_id), ORDERS_TTL,
+            lambda: self._fetch_player_orders(player_id)
+        )
+
+    def get_player_orders_many(self, players) -> dict:
+        """Orders mehrerer Spieler parallel abrufen: {player: orders}."""
+        players = list(dict.fromkeys(players))
+        results = self.pool.map(self.get_player_orders, players)
+        return dict(zip(players, results))
+
+    def _fetch_player_orders(self, player_id: str) -> list:
         url = f"{self.BASE_URL}/player/{player_id}/orders"
-        resp = requests.get(url)
-        resp.raise_for_status()
-        return resp.json()
\ No newline at end of file
+        return self._get_json(url)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        return cls.cache.stats()
+
+
+Metrics.shared().add_collector(_cache_gauges)
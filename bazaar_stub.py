@@ -0,0 +1,152 @@
+import argparse
+import json
+import logging
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from history_store import PERIOD_SECONDS, PERIOD_STEP
+from time_parser import TimeParser
+
+log = logging.getLogger(__name__)
+
+
+def _seed(name: str) -> int:
+    return zlib.crc32(name.encode())
+
+
+def _noise(t: np.ndarray, seed: int) -> np.ndarray:
+    # Deterministisches Rauschen in [-1, 1]: gleiche Zeit -> gleicher Wert, ohne Zustand
+    x = np.sin(t * 12.9898 + seed * 78.233) * 43758.5453
+    return (x - np.floor(x)) * 2 - 1
+
+
+class SyntheticMarket:
+    """Erfundene, aber stabile Kursverläufe für beliebig viele Items.
+
+    Preise sind eine Funktion von (Item, Zeit): jede Abfrage desselben
+    Zeitpunkts liefert dieselben Werte, und die Historie wächst mit der Uhr.
+    """
+
+    def __init__(self, items: int = 5000, orders: int = 200):
+        self.items = [f"ITEM_{i:05d}" for i in range(items)]
+        self.orders = orders
+
+    def prices(self, item: str, ts: np.ndarray):
+        seed = _seed(item)
+        base = 10 + seed % 100_000
+        period = 3600 * (1 + seed % 48)
+        wave = 0.05 * np.sin(2 * np.pi * ts / period + seed % 628 / 100)
+        sell = base * (1 + wave + 0.01 * _noise(ts, seed))
+        buy = sell * (1.01 + 0.02 * np.abs(_noise(ts, seed + 1)))
+        return np.round(buy, 1), np.round(sell, 1)
+
+    def history(self, item: str, start: float, end: float, step: float) -> list:
+        """Punkte im Bereich, neueste zuerst (wie die echte API)."""
+        ts = np.arange(np.ceil(start / step) * step, end, step)[::-1]
+        buy, sell = self.prices(item, ts)
+        vol = (1000 + 500 * _noise(ts, _seed(item) + 2)).round()
+        return [
+            {"timestamp": TimeParser.from_epoch(t), "buy": b, "sell": s,
+             "buyVolume": v, "sellVolume": v, "maxBuy": b, "maxSell": s, "minBuy": b, "minSell": s}
+            for t, b, s, v in zip(ts.tolist(), buy.tolist(), sell.tolist(), vol.tolist())
+        ]
+
+    def snapshot(self, item: str, now: float) -> dict:
+        buy, sell = self.prices(item, np.array([now]))
+        return {"buyPrice": float(buy[0]), "sellPrice": float(sell[0]),
+                "timeStamp": TimeParser.from_epoch(now)}
+
+    def player_orders(self, player: str, now: float) -> list:
+        # Orders liegen auf einem festen Minutenraster über 48 h: bestehende behalten
+        # ihren Zeitstempel, alle ``step`` Minuten kommt vorne eine neue dazu
+        seed = _seed(player)
+        step = max(1, 48 * 60 // self.orders)
+        newest = np.floor(np.floor(now / 60) / step)
+        ts = (newest - np.arange(self.orders)) * step * 60
+        qty = (1 + (np.abs(_noise(ts, seed)) * 640)).astype(int)
+        item_idx = (np.abs(_noise(ts, seed + 1)) * len(self.items)).astype(int)
+        return [
+            {"timestamp": TimeParser.from_epoch(t), "itemTag": self.items[i],
+             "quantity": int(q), "price": float(self.prices(self.items[i], np.array([t]))[1][0])}
+            for t, q, i in zip(ts.tolist(), qty.tolist(), item_idx.tolist())
+        ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    market: SyntheticMarket = None
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        now = time.time()
+        try:
+            body = self._route(parts, query, now)
+        except (KeyError, ValueError) as exc:
+            self.send_error(400, str(exc))
+            return
+        if body is None:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self, parts, query, now):
+        m = self.market
+        if parts == ["api", "items", "bazaar", "tags"]:
+            return m.items
+        if parts[:2] != ["api", "bazaar"]:
+            return None
+        rest = parts[2:]
+        if len(rest) == 3 and rest[0] == "player" and rest[2] == "orders":
+            return m.player_orders(rest[1], now)
+        if len(rest) == 2 and rest[1] == "snapshot":
+            return m.snapshot(rest[0], now)
+        if len(rest) == 3 and rest[1] == "history":
+            period = rest[2]
+            return m.history(rest[0], now - PERIOD_SECONDS[period], now, PERIOD_STEP[period])
+        if len(rest) == 2 and rest[1] == "history":
+            start = TimeParser.to_epoch(query["start"])
+            end = TimeParser.to_epoch(query["end"])
+            return m.history(rest[0], start, end, PERIOD_STEP["hour"])
+        return None
+
+    def log_message(self, fmt, *args):
+        log.debug(fmt, *args)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8099, items: int = 5000,
+          latency: float = 0.0) -> ThreadingHTTPServer:
+    handler = type("Handler", (StubHandler,), {"market": SyntheticMarket(items), "latency": latency})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    # Lokaler Ersatz für die Coflnet-API:
+    #   python bazaar_stub.py --items 5000 --latency 0.05
+    #   BAZAAR_API_ROOT=http://127.0.0.1:8099/api streamlit run main.py
+    parser = argparse.ArgumentParser(description="Synthetischer Bazaar-API-Stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--items", type=int, default=5000, help="Anzahl erfundener Items")
+    parser.add_argument("--latency", type=float, default=0.0, help="Verzögerung pro Anfrage (s)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    server = serve(args.host, args.port, args.items, args.latency)
+    log.info("Stub läuft auf http://%s:%d/api (%d Items)", args.host, args.port, args.items)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,71 @@
+import gc
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def measure(fn, setup=None, size: int = 1, repeat: int = 20, warmup: int = 2) -> dict:
+    """Misst ``fn(state)``; ``setup()`` liefert vor jedem Lauf frischen Zustand (nicht gemessen).
+
+    Ergebnis: Latenz-Perzentile in ms, Durchsatz (``size`` Einheiten pro Sekunde
+    beim Median) und Spitzen-Speicher eines zusätzlichen Laufs mit tracemalloc.
+    """
+    setup = setup or (lambda: None)
+    extra = {}
+    for _ in range(warmup):
+        fn(setup())
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        started = time.perf_counter()
+        out = fn(state)
+        times.append(time.perf_counter() - started)
+        if isinstance(out, dict):
+            extra = out
+    # Speicher getrennt messen: tracemalloc bremst und würde die Zeiten verfälschen
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    fn(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = np.asarray(times) * 1000
+    p50 = float(np.percentile(ms, 50))
+    return {
+        "size": size,
+        "p50_ms": p50,
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "per_s": size / (p50 / 1000) if p50 else float("inf"),
+        "peak_kb": peak / 1024,
+        **extra,
+    }
+
+
+def save(results: dict, path: str):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 1.2) -> list:
+    """Zeilen (Fall, p50 alt, p50 neu, Faktor, Regression?) für gemeinsame Fälle."""
+    rows = []
+    for name, result in current.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("inf")
+        mem = result["peak_kb"] / old["peak_kb"] if old["peak_kb"] else 1.0
+        rows.append((name, old["p50_ms"], result["p50_ms"], ratio, mem,
+                     ratio > tolerance or mem > tolerance))
+    return rows
@@ -0,0 +1,209 @@
+"""Benchmarks der heißen Pfade, offline gegen synthetische Daten.
+
+    python -m benchmarks.run                      # alle Fälle, Standardgrößen
+    python -m benchmarks.run --quick              # nur die kleinste Größe je Fall
+    python -m benchmarks.run --save               # Ergebnis als neue Baseline speichern
+    python -m benchmarks.run --compare            # gegen die Baseline vergleichen
+    python -m benchmarks.run -k optimizer         # nur Fälle, deren Name passt
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+from bazaar_stub import SyntheticMarket
+from benchmarks import harness
+from history_frame import HistoryFrame
+from history_store import PERIOD_STEP
+from time_parser import TimeParser
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+MARKET = SyntheticMarket(items=5000)
+NOW = 1_700_000_000.0
+
+
+def _frame(item: str, points: int, step: float = PERIOD_STEP["hour"]) -> HistoryFrame:
+    ts = NOW - step * np.arange(points)[::-1]
+    buy, sell = MARKET.prices(item, ts)
+    return HistoryFrame(ts, buy, sell, np.ones(points), np.ones(points))
+
+
+class _Quotes:
+    """Kurse ohne Netz für Portfolio.market_prices."""
+
+    def get_latest_quotes(self, items):
+        quotes = {}
+        for it in items:
+            snap = MARKET.snapshot(it, NOW)
+            quotes[it] = {"buy": snap["buyPrice"], "sell": snap["sellPrice"], "timestamp": snap["timeStamp"]}
+        return quotes
+
+
+class _Histories:
+    """``get_history_many`` ohne Netz, für PricePanel."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_history_many(self, items, period="day"):
+        return {it: self.frames[it] for it in items}
+
+
+class _Orders:
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    def get_player_orders_many(self, players):
+        return {p: self.payloads[p] for p in players}
+
+
+# --- Fälle: jeweils (setup, fn) für eine Größe, bei Aufräumbedarf als Kontextmanager ---
+def case_parse(n):
+    raw = [TimeParser.from_epoch(t) for t in NOW - 10 * np.arange(n)]
+    return (lambda: raw), (lambda r: TimeParser.parse_many(r))
+
+
+def case_parse_scalar(n):
+    raw = [TimeParser.from_epoch(t) for t in NOW - 10 * np.arange(n)]
+    return (lambda: raw), (lambda r: [TimeParser.parse(x) for x in r])
+
+
+def case_card(n):
+    from dashboard import Dashboard
+    from indicators import IndicatorEngine
+    frame = _frame("ITEM_00001", n)
+
+    def setup():
+        dash = Dashboard(api=None)
+        dash.indicators = IndicatorEngine()     # kalt: alle Ticks werden eingespeist
+        return dash
+
+    return setup, (lambda dash: dash._build_card("ITEM_00001", frame) and None)
+
+
+def case_chart_spec(n):
+    from chartRenderer import ChartRenderer
+    frame = _frame("ITEM_00002", n)
+
+    def run(_):
+        spec = ChartRenderer.render_charts(frame, 700)
+        return {"spec_kb": len(json.dumps(spec)) / 1024}
+
+    return (lambda: None), run
+
+
+@contextmanager
+def case_portfolio(n):
+    import ledger_db
+    from portfolio import Portfolio
+    # Eigene Datenbank im Temp-Verzeichnis, nach der Messung wieder entfernt
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        conn = ledger_db.connect(os.path.join(tmp, "portfolio.db"))
+        items = MARKET.items[:200]
+        rng = np.random.default_rng(0)
+        rows = [(items[i % len(items)], float(q), float(p), TimeParser.from_epoch(NOW - i), float(q))
+                for i, (q, p) in enumerate(zip(rng.integers(1, 100, n), rng.uniform(10, 1e5, n)))]
+        ledger_db.insert_many(conn, "portfolio", ["item", "quantity", "buy_price", "timestamp", "remaining"], rows)
+        ledger_db.rebuild_positions(conn, items)
+        pf = Portfolio.__new__(Portfolio)
+        pf.conn, pf.api = conn, _Quotes()
+
+        def run(p):
+            p.value_positions(p.get_open_lots())
+            p.summarize()
+
+        try:
+            yield (lambda: pf), run
+        finally:
+            conn.close()
+
+
+def case_optimizer(n):
+    from optimizer_engine import MeanVarianceEngine
+    from price_panel import PricePanel
+    items = MARKET.items[:n]
+    frames = {it: _frame(it, 288, PERIOD_STEP["day"]) for it in items}
+    lams = np.linspace(0, 1, 21)
+
+    def setup():
+        return PricePanel(_Histories(frames)), MeanVarianceEngine()
+
+    def run(state):
+        panel, engine = state
+        returns = panel.returns(items, "day")
+        key = panel.version(items, "day")
+        mu, cov, _ = engine.estimate(key, returns.to_numpy())
+        engine.frontier(key, mu, cov, lams)
+        engine.optimize(key, mu, cov, 0.5)
+
+    return setup, run
+
+
+def case_leaderboard(n):
+    from leaderboard import LeaderboardEngine
+    players = [f"P{i}" for i in range(n)]
+    payloads = {p: MARKET.player_orders(p, NOW) for p in players}
+    return (lambda: LeaderboardEngine(_Orders(payloads))), (lambda eng: eng.volumes(players, now=NOW))
+
+
+CASES = {
+    "parse_many": (case_parse, [1_000, 10_000, 100_000]),
+    "parse_scalar": (case_parse_scalar, [1_000, 10_000, 100_000]),
+    "card": (case_card, [360, 2_000, 20_000]),
+    "chart_spec": (case_chart_spec, [360, 2_000, 20_000]),
+    "portfolio": (case_portfolio, [1_000, 10_000, 100_000]),
+    "optimizer": (case_optimizer, [10, 100, 400]),
+    "leaderboard": (case_leaderboard, [10, 100, 500]),
+}
+
+
+def run_all(pattern: str = "", quick: bool = False, repeat: int = 15) -> dict:
+    results = {}
+    for name, (factory, sizes) in CASES.items():
+        if pattern not in name:
+            continue
+        for size in sizes[:1] if quick else sizes:
+            case = factory(size)
+            # Große Fälle seltener wiederholen, damit der Lauf in Minuten bleibt
+            reps = max(3, repeat // (1 + sizes.index(size) * 2))
+            key = f"{name}/{size}"
+            with case if hasattr(case, "__enter__") else nullcontext(case) as (setup, fn):
+                results[key] = harness.measure(fn, setup, size=size, repeat=reps)
+            r = results[key]
+            print(f"{key:<24} p50 {r['p50_ms']:9.2f} ms  p90 {r['p90_ms']:9.2f} ms  "
+                  f"{r['per_s']:12,.0f}/s  peak {r['peak_kb']:10,.0f} KiB"
+                  + (f"  spec {r['spec_kb']:,.0f} KiB" if "spec_kb" in r else ""), flush=True)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks der heißen Pfade")
+    parser.add_argument("-k", default="", help="Nur Fälle, deren Name dies enthält")
+    parser.add_argument("--quick", action="store_true", help="Nur die kleinste Größe je Fall")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--save", nargs="?", const=BASELINE, help="Ergebnisse als Baseline speichern")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, help="Mit Baseline vergleichen")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="Faktor, ab dem eine Regression gilt")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.k, args.quick, args.repeat)
+    if args.save:
+        harness.save(results, args.save)
+        print(f"Baseline gespeichert: {args.save}")
+    if args.compare:
+        rows = harness.compare(results, harness.load(args.compare), args.tolerance)
+        print(f"\n{'Fall':<24} {'alt ms':>10} {'neu ms':>10} {'Zeit':>7} {'Speicher':>9}")
+        for name, old, new, ratio, mem, bad in rows:
+            print(f"{name:<24} {old:10.2f} {new:10.2f} {ratio:6.2f}x {mem:8.2f}x"
+                  + ("  ← Regression" if bad else ""))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
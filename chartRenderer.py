@@ -1,47 +1,87 @@
-import pandas as pd
+import json
+from functools import lru_cache
+
 import altair as alt
+import numpy as np
+
+from downsample import lttb, minmax, points_for_width, reduce_many
+from history_frame import HistoryFrame
 
 class ChartRenderer:
+    # Name der Brush-Selektion; Dashboard liest darüber den Zoom-Bereich aus
+    BRUSH = "zoom"
+    # Benannte Datasets: jede Ebene referenziert eines davon, statt eigene Kopien einzubetten
+    OVERVIEW = "overview"
+    DETAIL = "detail"
+
     @staticmethod
-    def render_charts(times, sell, buy, marge):
-        df = pd.DataFrame({
-            'Zeit': times,
-            'Sell': sell,
-            'Buy': buy,
-            'Marge': marge
-        })
-
-        # Melt für Sell+Buy
-        df_sb = df.melt(
-            id_vars=['Zeit'],
-            value_vars=['Sell', 'Buy'],
-            var_name='Metric',
-            value_name='Wert'
-        )
-        df_m = df[['Zeit', 'Marge']]
+    def _records(frame: HistoryFrame) -> list:
+        # UTC-Epoch-Millisekunden: eindeutig, egal in welcher Zeitzone der Browser läuft
+        zeit = np.round(frame.ts * 1000).astype(np.int64).tolist()
+        clean = lambda arr: [None if v != v else v for v in arr.tolist()]
+        return [
+            {'Zeit': z, 'Sell': s, 'Buy': b, 'Marge': m}
+            for z, s, b, m in zip(zeit, clean(frame.sell), clean(frame.buy), clean(frame.margin))
+        ]
+
+    @staticmethod
+    def downsample(frame: HistoryFrame, width: int = 700, detail_range=None):
+        """Reduziert den Frame serverseitig auf eine zur Breite passende Punktzahl.
+
+        Übersicht: Min/Max je Bucket (Ausreißer bleiben sichtbar).
+        Detail: LTTB, bei gesetztem ``detail_range`` (Unix-Sekunden) nur über den
+        gezoomten Bereich – dort also in voller Auflösung des Budgets.
+        """
+        n = points_for_width(width)
+        cols = lambda f: (f.sell, f.buy, f.margin)
+        overview = frame.take(reduce_many(frame.ts, cols(frame), n, method=minmax))
+        source = frame.between(*detail_range) if detail_range else frame
+        if len(source) < 2:
+            source = frame
+        detail = source.take(reduce_many(source.ts, cols(source), n, method=lttb))
+        return overview, detail
+
+    @staticmethod
+    def render_charts(frame: HistoryFrame, width: int = 700, detail_range=None) -> dict:
+        """Vega-Lite-Spec für eine Karte: gecachtes Layout plus frische Datasets."""
+        overview, detail = ChartRenderer.downsample(frame, width, detail_range)
+        spec = json.loads(ChartRenderer._template())
+        spec['datasets'] = {
+            ChartRenderer.OVERVIEW: ChartRenderer._records(overview),
+            ChartRenderer.DETAIL: ChartRenderer._records(detail),
+        }
+        return spec
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _template(overview_height: int = 80, detail_height: int = 300) -> str:
+        """Layout einmal pro Größe bauen und als JSON cachen (ohne Daten)."""
+        over_data = alt.NamedData(name=ChartRenderer.OVERVIEW)
+        detail_data = alt.NamedData(name=ChartRenderer.DETAIL)
 
         # Interaktive Legendenselektion
         legend_selection = alt.selection_point(fields=['Metric'], bind='legend')
 
         # Brush für Zoom/Detailbereich
-        brush = alt.selection_interval(encodings=['x'])
+        brush = alt.selection_interval(encodings=['x'], name=ChartRenderer.BRUSH)
 
-        # Übersicht Sell+Buy
+        # Übersicht Sell+Buy (Fold im Browser statt zweitem, gemeltem Dataset)
         overview_sb = (
-            alt.Chart(df_sb)
+            alt.Chart(over_data)
+            .transform_fold(['Sell', 'Buy'], as_=['Metric', 'Wert'])
             .mark_area(opacity=0.3)
             .encode(
                 x=alt.X('Zeit:T', title=''),
                 y=alt.Y('Wert:Q', title=''),
                 color=alt.Color('Metric:N', title='Typ')
             )
-            .properties(width='container', height=80)
-            .add_selection(brush)
+            .properties(width='container', height=overview_height)
+            .add_params(brush)
         )
 
-        # Detail Sell+Buy: zwei Linien aus dem Original-DF + gemeinsamer Tooltip
+        # Detail Sell+Buy: zwei Linien aus demselben Dataset + gemeinsamer Tooltip
         detail_sb = (
-            alt.Chart(df)
+            alt.Chart(detail_data)
             .transform_filter(brush)
         )
         # Buy-Linie
@@ -57,16 +97,16 @@ class ChartRenderer:
             color=alt.value('#d62728')
         )
 
-
-        # Hover-Selektion
-        selector = alt.selection_single(on='mouseover', fields=['Zeit'], nearest=True, empty='none')
+        # Hover-Selektion (einmal definiert, von beiden Punkt-Ebenen genutzt)
+        selector = alt.selection_point(name='hover_sb', on='mouseover', fields=['Zeit'],
+                                       nearest=True, empty=False)
         # Punkte nur beim Hover
         buy_points = buy_line.mark_circle().encode(
-            opacity=alt.condition(selector, {"value": 1}, {"value": 0})
-        ).add_selection(selector)
+            opacity=alt.condition(selector, alt.value(1), alt.value(0))
+        ).add_params(selector)
         sell_points = sell_line.mark_circle().encode(
-            opacity=alt.condition(selector, {"value": 1}, {"value": 0})
-        ).add_selection(selector)
+            opacity=alt.condition(selector, alt.value(1), alt.value(0))
+        )
 
         # Rule + gemeinsamer Tooltip mit beiden Werten
         rule = detail_sb.mark_rule(color='gray').encode(
@@ -80,38 +120,23 @@ class ChartRenderer:
 
         chart_sb = (
             alt.layer(buy_line, sell_line, buy_points, sell_points, rule)
-            .properties(width='container', height=300)
+            .properties(width='container', height=detail_height)
             .resolve_scale(y='independent')
-            .interactive()
-        )
-
-        # Selektor + Hover-Effekte
-        selector_sb = alt.selection_single(on='mouseover', fields=['Zeit'], nearest=True, empty='none')
-        points_sb = (
-            detail_sb
-            .mark_circle()
-            .encode(opacity=alt.condition(selector_sb, alt.value(1), alt.value(0)))
-            .add_selection(selector_sb)
-        )
-        rule_sb = (
-            detail_sb
-            .mark_rule(color='gray')
-            .encode(x='Zeit:T')
-            .transform_filter(selector_sb)
+            .add_params(alt.selection_interval(bind='scales', name='scales_sb'))
         )
 
-        # Übersicht Marge
+        # Übersicht Marge (gleiches Dataset wie Sell+Buy)
         overview_m = (
-            alt.Chart(df_m)
+            alt.Chart(over_data)
             .mark_area(color='green', opacity=0.3)
             .encode(x='Zeit:T', y='Marge:Q')
-            .properties(width='container', height=80)
-            .add_selection(brush)
+            .properties(width='container', height=overview_height)
+            .add_params(brush)
         )
 
         # Detail Marge
         detail_m = (
-            alt.Chart(df_m)
+            alt.Chart(detail_data)
             .transform_filter(brush)
             .mark_line(point=True, color='green')
             .encode(
@@ -119,16 +144,16 @@ class ChartRenderer:
                 y='Marge:Q',
                 tooltip=['Zeit:T', 'Marge:Q']
             )
-            .properties(width='container', height=300)
-            .interactive()
+            .properties(width='container', height=detail_height)
         )
 
-        selector_m = alt.selection_single(on='mouseover', fields=['Zeit'], nearest=True, empty='none')
+        selector_m = alt.selection_point(name='hover_m', on='mouseover', fields=['Zeit'],
+                                         nearest=True, empty=False)
         points_m = (
             detail_m
             .mark_circle()
             .encode(opacity=alt.condition(selector_m, alt.value(1), alt.value(0)))
-            .add_selection(selector_m)
+            .add_params(selector_m)
         )
         rule_m = (
             detail_m
@@ -136,13 +161,18 @@ class ChartRenderer:
             .encode(x='Zeit:T')
             .transform_filter(selector_m)
         )
-        chart_m = alt.layer(detail_m, points_m, rule_m).resolve_scale(y='independent')
+        chart_m = (
+            alt.layer(detail_m, points_m, rule_m)
+            .resolve_scale(y='independent')
+            .add_params(alt.selection_interval(bind='scales', name='scales_m'))
+        )
 
         # Gesamtes Layout kombinieren
-        return (
+        chart = (
             alt.vconcat(
                 alt.vconcat(overview_sb, chart_sb),
                 alt.vconcat(overview_m, chart_m),
                 spacing=20
             ).resolve_scale(x='shared', y='independent')
         )
+        return json.dumps(chart.to_dict())
@@ -1,18 +1,15 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-from time_parser import TimeParser
 from bazaar_api import BazaarAPI
+from indicators import IndicatorEngine
+from time_parser import TimeParser
 
 class ChartAnalysis:
+    REFRESH_INTERVAL = 60
+
     def __init__(self, api: BazaarAPI):
         self.api = api
-
-    @staticmethod
-    def _bollinger(series: pd.Series, window:int=20, k:int=2):
-        ma = series.rolling(window).mean()
-        sd = series.rolling(window).std()
-        return ma, ma+k*sd, ma-k*sd
+        self.indicators = IndicatorEngine.shared()
 
     def render(self):
         st.header("📈 Erweiterte Chart-Analyse")
@@ -22,15 +19,15 @@ class ChartAnalysis:
         if not data:
             st.error("Keine Daten verfügbar.")
             return
-        df = pd.DataFrame({
-            'time': [TimeParser.parse(d['timestamp']) for d in data],
-            'price': [d['sell'] for d in data]
-        })
-        ma, ub, lb = ChartAnalysis._bollinger(df['price'])
+        # Bollinger-Bänder (20, 2σ) inkrementell: nur neue Ticks werden verrechnet
+        ind = self.indicators.feed(item, period, "sell", data, window=20, k=2)
+        ts, ma, ub, lb, ema = ind.series(since=data.ts[0])
+        band_time = TimeParser.from_epoch_many(ts)
         fig, ax = plt.subplots(figsize=(8,4))
-        ax.plot(df['time'], df['price'], label='Preis')
-        ax.plot(df['time'], ma, label='GD')
-        ax.plot(df['time'], ub, label='GD+2σ', linestyle='--')
-        ax.plot(df['time'], lb, label='GD-2σ', linestyle='--')
+        ax.plot(data.time, data.sell, label='Preis')
+        ax.plot(band_time, ma, label='GD')
+        ax.plot(band_time, ub, label='GD+2σ', linestyle='--')
+        ax.plot(band_time, lb, label='GD-2σ', linestyle='--')
+        ax.plot(band_time, ema, label='EMA', linestyle=':')
         ax.legend(); ax.grid(True)
         st.pyplot(fig)
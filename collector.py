@@ -0,0 +1,84 @@
+import logging
+import sys
+import threading
+import time
+
+from bazaar_api import BazaarAPI
+
+log = logging.getLogger(__name__)
+
+
+class Collector(threading.Thread):
+    """Pollt die verfolgten Items in festem Takt und schreibt in den HistoryStore.
+
+    Läuft einmal pro Server-Prozess. Solange er läuft, sind die Seiten reine
+    Leser des lokalen Speichers; die Upstream-Last hängt damit nicht mehr von
+    der Zahl offener Browser-Tabs ab.
+    """
+
+    def __init__(self, api: BazaarAPI = None, interval: float = 10.0):
+        super().__init__(name="bazaar-collector", daemon=True)
+        self.api = api or BazaarAPI()
+        self.interval = interval
+        self.tracked = set()            # {(item, period)}
+        self.listeners = []             # fn(item, period), nach jedem Poll mit neuen Ticks
+        self._lock = threading.Lock()
+        self._halt = threading.Event()
+
+    def track(self, items, period: str = "hour"):
+        with self._lock:
+            self.tracked.update((item, period) for item in items)
+
+    def subscribe(self, listener):
+        """``listener(item, period)`` wird nach neuen Ticks im Collector-Thread aufgerufen."""
+        self.listeners.append(listener)
+
+    def stop(self):
+        self._halt.set()
+
+    def start(self):
+        BazaarAPI.collector = self
+        super().start()
+
+    def poll_once(self):
+        with self._lock:
+            keys = sorted(self.tracked)
+        # Alle Keys parallel über den gepoolten Client der API abrufen
+        list(self.api.pool.map(self._poll, keys))
+
+    def _poll(self, key):
+        item, period = key
+        try:
+            if not self.api.sync_history(item, period):
+                return
+            # Neue Ticks: Cache-Eintrag verwerfen, damit Leser sie sofort sehen
+            self.api.cache.invalidate(("history", item, period))
+        except Exception:
+            log.exception("Abruf fehlgeschlagen: %s/%s", item, period)
+            return
+        for listener in self.listeners:
+            try:
+                listener(item, period)
+            except Exception:
+                log.exception("Listener fehlgeschlagen: %s/%s", item, period)
+
+    def run(self):
+        while not self._halt.is_set():
+            started = time.monotonic()
+            self.poll_once()
+            self._halt.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        if BazaarAPI.collector is self:
+            BazaarAPI.collector = None
+
+
+if __name__ == "__main__":
+    # Eigenständiger Betrieb: python collector.py ITEM [ITEM ...]
+    logging.basicConfig(level=logging.INFO)
+    collector = Collector()
+    collector.track(sys.argv[1:] or ["BOOSTER_COOKIE"])
+    collector.start()
+    try:
+        while collector.is_alive():
+            collector.join(1)
+    except KeyboardInterrupt:
+        collector.stop()
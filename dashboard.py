@@ -1,16 +1,27 @@
 import streamlit as st
-from statistics import mean, stdev
 
 from chartRenderer import ChartRenderer
 import streamlit.components.v1 as components
 
+from alerts import BASELINE_WINDOW, classify
 from bazaar_api import BazaarAPI
-from time_parser import TimeParser
+from history_frame import HistoryFrame
+from indicators import IndicatorEngine
+from instrumentation import Metrics
 
 
 class Dashboard:
+    # Karten aktualisieren sich einzeln als Fragment, daher kein Seiten-Refresh
+    REFRESH_INTERVAL = None
+    CARD_REFRESH = 20       # Sekunden
+    # Für main.py: Seite aktualisiert sich über Fragmente (run_every) selbst
+    FRAGMENT_REFRESH = CARD_REFRESH
+    CHART_WIDTH = 700       # px pro Karte (zwei Spalten im Wide-Layout), bestimmt die Punktzahl
+
     def __init__(self, api: BazaarAPI):
         self.api = api
+        self.indicators = IndicatorEngine.shared()
+        self.metrics = Metrics.shared()
         self.items = [
             "BOOSTER_COOKIE", "RECOMBOBULATOR_3000", "ENCHANTED_SEA_LUMIES",
             "AGATHA_COUPON", "KISMET_FEATHER", "FIGSTONE", "SUMMONING_EYE",
@@ -26,13 +37,17 @@ class Dashboard:
         st.title("📊 Preisverlauf & Marge")
         self._inject_css()
 
+        st.caption(f"Karten aktualisieren sich alle {self.CARD_REFRESH} s einzeln.")
+
+        # Alle ausgewählten Items in einem parallelen Batch vorladen (füllt den API-Cache)
+        self.api.get_history_many(selected)
         for i in range(0, len(selected), 2):
             cols = st.columns(2)
             for j, col in enumerate(cols):
                 idx = i + j
                 if idx < len(selected):
                     with col:
-                        self._render_card(selected[idx])
+                        self._card_fragment(selected[idx])
 
     def _inject_css(self):
         st.markdown("""
@@ -56,64 +71,70 @@ class Dashboard:
         </style>
         """, unsafe_allow_html=True)
 
-    def _render_card(self, item: str):
-        data = self.api.get_history(item)
+    @st.fragment(run_every=CARD_REFRESH)
+    def _card_fragment(self, item: str):
+        # Eigener Rerun pro Karte: ein Update eines Items rendert die anderen nicht neu.
+        # Fragment-Reruns laufen ohne den Seiten-Timer in main.py und werden hier gemessen;
+        # beim vollen Rerun zählt die Karte nur zur Seite "Dashboard".
+        with self.metrics.rerun("Dashboard-Karte"):
+            self._render_card(item, self.api.get_history(item))
+
+    def _render_card(self, item: str, data: HistoryFrame):
         if not data:
             st.error(f"⚠️ Keine Daten für {item}")
             return
 
-        times = [TimeParser.parse(d['timestamp']) for d in data]
-        buy = [d['buy'] for d in data]
-        sell = [d['sell'] for d in data]
-        marge = [round(b - s, 1) for b, s in zip(buy, sell)]
-        tax = [round(b * 0.98875 - s, 1) for b, s in zip(buy, sell)]
+        # Per Brush gewählter Bereich -> Detailansicht wird serverseitig verfeinert
+        chart_key = f"chart_{item}"
+        detail_range = self._zoom_range(st.session_state.get(chart_key))
+
+        # Unveränderte Daten: HTML und Chart-Spec der letzten Runde wiederverwenden
+        # Pro Session (Zoom ist sessionabhängig): item -> (version, card_html, chart_spec)
+        card_cache = st.session_state.setdefault("card_cache", {})
+        version = (data.version, detail_range)
+        cached = card_cache.get(item)
+        if cached is not None and cached[0] == version:
+            _, card_html, spec = cached
+        else:
+            card_html, spec = self._build_card(item, data, detail_range)
+            card_cache[item] = (version, card_html, spec)
+
+        st.markdown(card_html, unsafe_allow_html=True)
+        st.vega_lite_chart(spec, use_container_width=True, key=chart_key,
+                           on_select="rerun", selection_mode=ChartRenderer.BRUSH)
+
+    @staticmethod
+    def _zoom_range(event):
+        # Vega liefert die Intervallgrenzen als UTC-Epoch-Millisekunden (wie in _records)
+        try:
+            lo, hi = event["selection"][ChartRenderer.BRUSH]["Zeit"]
+        except (KeyError, TypeError, ValueError):
+            return None
+        return (lo / 1000, hi / 1000)
+
+    def _build_card(self, item: str, data: HistoryFrame, detail_range=None):
+        buy = data.buy
+        sell = data.sell
+        marge = data.margin
+        tax = data.margin_after_tax
         roi = (tax[-1] / buy[-1] * 100) if buy[-1] else 0
         roi_color = 'lime' if roi >= 10 else 'orange' if roi >= 3 else 'tomato'
 
-        # Prozent-basierte Schwellen mit Ø vorher und Aktuell
-        window = tax[-11:-1] if len(tax) >= 11 else []
-        avg, sd = (mean(window), stdev(window)) if window else (0, 0)
+        # Prozent-basierte Schwellen mit Ø vorher (letzte 10) und Aktuell,
+        # laufend aus dem Indikator-Zustand statt pro Refresh neu berechnet
+        ind = self.indicators.feed(item, "hour", "margin_after_tax", data, window=BASELINE_WINDOW)
+        avg, sd = ind.baseline
         curr = tax[-1]
         diff = curr - avg
-        pct = (diff / avg * 100) if avg else 0
+        pct = ind.pct
 
-        warning_html = ''
-        if pct > 20:
-            warning_html = (
-                f"<div style='background:rgba(0,200,0,0.7); padding:8px; border-radius:6px;'>"
-                f"<strong>🚀 Massive Steigerung!</strong><br>"
-                f"Ø vorher: {avg:,.1f} &nbsp; Aktuell: {curr:,.1f}<br>"
-                f"∆: {pct:+.1f}% ({diff:+,.1f} Coins)"
-                f"</div>"
-            )
-        elif pct > 10:
-            warning_html = (
-                f"<div style='background:rgba(0,128,0,0.6); padding:8px; border-radius:6px;'>"
-                f"<strong>📈 Stark gestiegen!</strong><br>"
-                f"Ø vorher: {avg:,.1f} &nbsp; Aktuell: {curr:,.1f}<br>"
-                f"∆: {pct:+.1f}% ({diff:+,.1f} Coins)"
-                f"</div>"
-            )
-        elif pct < -20:
-            warning_html = (
-                f"<div style='background:rgba(200,0,0,0.7); padding:8px; border-radius:6px;'>"
-                f"<strong>📉 Massiver Einbruch!</strong><br>"
-                f"Ø vorher: {avg:,.1f} &nbsp; Aktuell: {curr:,.1f}<br>"
-                f"∆: {pct:+.1f}% ({diff:+,.1f} Coins)"
-                f"</div>"
-            )
-        elif pct < -10:
+        # Gleiche Stufen wie der Alarm-Dienst (alerts.py)
+        hit = classify(pct)
+        if hit is not None:
+            _, title, color = hit
             warning_html = (
-                f"<div style='background:rgba(255,80,80,0.6); padding:8px; border-radius:6px;'>"
-                f"<strong>⚠️ Stark gefallen!</strong><br>"
-                f"Ø vorher: {avg:,.1f} &nbsp; Aktuell: {curr:,.1f}<br>"
-                f"∆: {pct:+.1f}% ({diff:+,.1f} Coins)"
-                f"</div>"
-            )
-        elif pct < -5:
-            warning_html = (
-                f"<div style='background:rgba(255,120,120,0.6); padding:8px; border-radius:6px;'>"
-                f"<strong>⚠️ Deutlicher Einbruch!</strong><br>"
+                f"<div style='background:{color}; padding:8px; border-radius:6px;'>"
+                f"<strong>{title}</strong><br>"
                 f"Ø vorher: {avg:,.1f} &nbsp; Aktuell: {curr:,.1f}<br>"
                 f"∆: {pct:+.1f}% ({diff:+,.1f} Coins)"
                 f"</div>"
@@ -126,13 +147,12 @@ class Dashboard:
                 f"</div>"
             )
 
-
         card_html = f"""
         <div class='card'>
           <h3>📦 {item.replace('_', ' ').title()}</h3>
           {warning_html}
           <div class='metrics'>
-            <div><div class='label'>Letzte Abfrage</div><div class='value'>{times[-1].strftime('%H:%M:%S')}</div></div>
+            <div><div class='label'>Letzte Abfrage</div><div class='value'>{data.time[-1].strftime('%H:%M:%S')}</div></div>
             <div><div class='label'>Sell</div><div class='value'>{buy[-1]:,}</div></div>
             <div><div class='label'>Buy</div><div class='value'>{sell[-1]:,}</div></div>
             <div><div class='label'>Marge</div><div class='value'>{marge[-1]:,}</div></div>
@@ -142,7 +162,5 @@ class Dashboard:
           <hr>
         </div>
         """
-        st.markdown(card_html, unsafe_allow_html=True)
-
-        chart = ChartRenderer.render_charts(times, sell, buy, marge)
-        st.altair_chart(chart, use_container_width=True)
\ No newline at end of file
+        spec = ChartRenderer.render_charts(data, self.CHART_WIDTH, detail_range)
+        return card_html, spec
\ No newline at end of file
@@ -0,0 +1,82 @@
+import pandas as pd
+import streamlit as st
+from instrumentation import METRICS_FILE, Metrics
+
+
+def _histogram_table(histograms: dict, name: str, label: str, scale: float = 1.0) -> pd.DataFrame:
+    rows = [
+        {label: dict(labels).get(label, "–"), "Anzahl": count,
+         "Ø": total / count * scale if count else float("nan"),
+         "p50": p50 * scale, "p95": p95 * scale, "Summe": total * scale}
+        for (n, labels), (count, total, p50, p95) in histograms.items() if n == name
+    ]
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index(label).sort_values("Summe", ascending=False)
+
+
+class Diagnostics:
+    REFRESH_INTERVAL = 20
+
+    def __init__(self):
+        self.metrics = Metrics.shared()
+
+    def render(self):
+        st.header("🩺 Diagnose")
+        counters, gauges, histograms = self.metrics.snapshot()
+        st.caption("Werte seit Prozessstart; Perzentile sind aus den Histogramm-Buckets geschätzt.")
+
+        rss = gauges.get(("process_resident_memory_bytes", ()))
+        peak = gauges.get(("process_peak_memory_bytes", ()))
+        cache = {dict(labels)["stat"]: v for (n, labels), v in gauges.items() if n == "bazaar_cache"}
+        cols = st.columns(4)
+        cols[0].metric("Speicher (RSS)", f"{rss / 2**20:,.0f} MiB" if rss else "–")
+        cols[1].metric("Speicher (Spitze)", f"{peak / 2**20:,.0f} MiB" if peak else "–")
+        cols[2].metric("Cache-Trefferquote", f"{cache.get('hit_rate', 0):.0%}")
+        cols[3].metric("Cache-Einträge", f"{cache.get('size', 0):,.0f}")
+
+        st.subheader("Render-Zeiten je Seite (ms)")
+        renders = _histogram_table(histograms, "page_render_seconds", "page", 1000)
+        if renders.empty:
+            st.info("Noch keine Seite gemessen.")
+        else:
+            st.bar_chart(renders["p95"])
+            st.dataframe(renders.round(1), use_container_width=True)
+
+        st.subheader("Upstream-Latenz je Endpunkt (ms)")
+        latency = _histogram_table(histograms, "bazaar_upstream_seconds", "endpoint", 1000)
+        if latency.empty:
+            st.info("Noch keine Upstream-Anfragen.")
+        else:
+            errors = {dict(labels)["endpoint"]: v for (n, labels), v in counters.items()
+                      if n == "bazaar_upstream_errors_total"}
+            latency["Fehler"] = latency.index.map(lambda e: errors.get(e, 0))
+            payload = _histogram_table(histograms, "bazaar_payload_bytes", "endpoint", 1 / 1024)
+            if not payload.empty:
+                latency["Ø KiB"] = payload["Ø"]
+                latency["Summe KiB"] = payload["Summe"]
+            st.dataframe(latency.round(1), use_container_width=True)
+
+        st.subheader("Aufrufe pro Rerun")
+        calls = _histogram_table(histograms, "rerun_api_calls", "page")
+        upstream = _histogram_table(histograms, "rerun_upstream_requests", "page")
+        if calls.empty:
+            st.info("Noch keine Reruns gemessen.")
+        else:
+            table = pd.DataFrame({"Reruns": calls["Anzahl"], "Ø API-Aufrufe": calls["Ø"],
+                                  "Ø Upstream": upstream["Ø"], "p95 Upstream": upstream["p95"]})
+            st.dataframe(table.round(1), use_container_width=True)
+            st.caption("Differenz der prozessweiten Zähler – Collector und parallele Sessions zählen mit.")
+
+        methods = {dict(labels)["method"]: v for (n, labels), v in counters.items()
+                   if n == "bazaar_api_calls_total"}
+        if methods:
+            st.subheader("API-Aufrufe gesamt (inkl. Cache-Treffer)")
+            st.dataframe(pd.Series(methods, name="Aufrufe").sort_values(ascending=False),
+                         use_container_width=True)
+
+        st.subheader("Export")
+        if METRICS_FILE:
+            st.caption(f"Prometheus-Textdatei: `{METRICS_FILE}` (nach jedem Rerun aktualisiert)")
+        st.download_button("metrics.prom herunterladen", self.metrics.prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def points_for_width(width_px: int, px_per_point: float = 2.0, minimum: int = 50) -> int:
+    """Sinnvolle Punktzahl für einen Chart: mehr als ~1 Punkt pro 2 px sieht niemand."""
+    return max(minimum, int(width_px / px_per_point))
+
+
+def minmax(y: np.ndarray, n: int) -> np.ndarray:
+    """Indizes von Minimum und Maximum je Bucket, plus erster und letzter Punkt.
+
+    Erhält Ausreißer vollständig; gut für Übersichts-Flächen. Höchstens ``n``
+    Indizes (ab n = 4).
+    """
+    size = len(y)
+    if size <= n:
+        return np.arange(size)
+    # Zwei Plätze für die Endpunkte freihalten
+    buckets = max(1, (n - 2) // 2)
+    bucket = np.arange(size) * buckets // size
+    nan = np.isnan(y)
+    # Innerhalb jedes Buckets sortieren; NaN landen nie auf Min/Max-Position
+    by_min = np.lexsort((np.where(nan, np.inf, y), bucket))
+    by_max = np.lexsort((np.where(nan, -np.inf, y), bucket))
+    starts = np.searchsorted(bucket, np.arange(buckets), side='left')
+    ends = np.r_[starts[1:], size] - 1
+    idx = np.concatenate([by_min[starts], by_max[ends]])
+    return np.unique(np.r_[0, idx, size - 1])
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: Indizes von ``n`` formtreuen Punkten."""
+    size = len(x)
+    if size <= n or n < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    # n-2 innere Buckets über [1, size-1); erster und letzter Punkt bleiben fix
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Durchschnitt des nächsten Buckets (bzw. letzter Punkt) als dritte Ecke
+        if i + 2 < len(edges):
+            nlo, nhi = hi, max(edges[i + 2], hi + 1)
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def reduce_many(x: np.ndarray, columns, n: int, method=lttb) -> np.ndarray:
+    """Gemeinsame Indexmenge für mehrere Spalten (Vereinigung, sortiert)."""
+    if len(x) <= n:
+        return np.arange(len(x))
+    per_col = max(3, n // max(1, len(columns)))
+    if method is minmax:
+        parts = [minmax(col, per_col) for col in columns]
+    else:
+        parts = [lttb(x, col, per_col) for col in columns]
+    return np.unique(np.concatenate(parts))
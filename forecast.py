@@ -1,61 +1,58 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import timedelta
 from bazaar_api import BazaarAPI
+from forecast_engine import ForecastEngine, MODELS
 from time_parser import TimeParser
 
 class Forecast:
+    REFRESH_INTERVAL = None
+
+    def __init__(self, api: BazaarAPI, items):
+        self.api = api
+        self.items = list(items)
+        self.engine = ForecastEngine.shared()
+
     def render(self):
         st.header("🔮 Short-Term Forecasting")
-        # Auswahl des Items
-        item = st.selectbox(
-            "Item für Forecast:",
-            ["BOOSTER_COOKIE", "RECOMBOBULATOR_3000"],
-            key="forecast_item"
-        )
         # Auswahl des Zeitraums für historische Daten
         period = st.selectbox(
             "Historischer Zeitraum:",
             ["hour", "day", "week"],
             key="forecast_period"
         )
-        # Abruf historischer Verkäufe
-        api = BazaarAPI()
-        data = api.get_history(item, period)
-        if not data:
-            st.error("⚠️ Keine historischen Daten verfügbar.")
-            return
-
-        # DataFrame vorbereiten
-        df_hist = pd.DataFrame({
-            'ds': [TimeParser.parse(d['timestamp']) for d in data],
-            'y':  [d['sell'] for d in data]
-        })
-        df_hist['ts'] = df_hist['ds'].map(lambda dt: dt.timestamp())
-
-        # Lineare Regression auf Zeitstempel vs. Preis
-        coef, intercept = np.polyfit(df_hist['ts'], df_hist['y'], 1)
-
         # Forecast-Horizont wählen
         hours = st.slider(
             "Forecast-Horizont (Stunden):", 1, 24, 6, key="forecast_horizon"
         )
-        last_time = df_hist['ds'].iloc[-1]
-        future_times = [last_time + timedelta(hours=i) for i in range(1, hours + 1)]
-        future_ts = np.array([dt.timestamp() for dt in future_times])
-        yhat = coef * future_ts + intercept
 
-        # Ergebnis-DF
-        df_fc = pd.DataFrame({
-            'Zeit': future_times,
-            'Vorhersage': yhat
-        }).set_index('Zeit')
+        # Ein Durchgang für die ganze Watchlist; Parameter bleiben bis zu neuen Ticks gecacht
+        horizons = 3600 * np.arange(1, hours + 1)
+        fc = self.engine.forecast(self.items, horizons, period)
+        params = self.engine.fit(self.items, period)
+        if not np.isfinite(params['last']).any():
+            st.error("⚠️ Keine historischen Daten verfügbar.")
+            return
+
+        # Übersicht: alle Items zum gewählten Horizont
+        st.subheader(f"Watchlist in {hours} h")
+        table = fc.xs(float(horizons[-1]), level='Horizont').copy()
+        table.insert(0, 'Aktuell', params['last'])
+        table['Δ Trend %'] = (table['Trend'] / table['Aktuell'] - 1) * 100
+        st.dataframe(table.round(1), use_container_width=True)
+
+        # Detail: Historie und Vorhersagen eines Items
+        item = st.selectbox("Item für Forecast:", self.items, key="forecast_item")
+        data = self.api.get_history(item, period)
+        if not data:
+            st.error("⚠️ Keine historischen Daten verfügbar.")
+            return
+        future_times = TimeParser.from_epoch_many(params['end'] + horizons)
+        df_fc = fc.loc[item].set_axis(future_times)[list(MODELS)]
 
-        # Anzeige: Historie und Forecast in einem Chart
         st.subheader("Historischer Verlauf vs. Forecast")
         chart_df = pd.concat([
-            df_hist.set_index('ds')['y'].rename('Historie'),
-            df_fc['Vorhersage']
-        ])
+            pd.Series(data.sell, index=data.time, name='Historie'),
+            df_fc
+        ], axis=1)
         st.line_chart(chart_df, height=300)
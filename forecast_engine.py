@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from price_panel import PricePanel
+
+# Modelle, die für jede Watchlist berechnet werden
+MODELS = ("Trend", "EWMA", "Holt")
+
+
+def fit_trend(x: np.ndarray, y: np.ndarray):
+    """Lineare Regression y = a·x + b für alle Spalten gleichzeitig (NaN werden ignoriert)."""
+    mask = ~np.isnan(y)
+    n = mask.sum(axis=0)
+    xm = np.where(mask, x[:, None], 0.0)
+    ym = np.where(mask, y, 0.0)
+    sx, sy = xm.sum(axis=0), ym.sum(axis=0)
+    sxx, sxy = (xm * xm).sum(axis=0), (xm * ym).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        denom = n * sxx - sx * sx
+        slope = np.where(denom > 0, (n * sxy - sx * sy) / denom, 0.0)
+        intercept = (sy - slope * sx) / n
+    return slope, intercept
+
+
+def fit_ewma(y: np.ndarray, alpha: float):
+    """Exponentiell gewichteter Mittelwert je Spalte in geschlossener Form."""
+    weights = (1 - alpha) ** np.arange(len(y))[::-1]
+    mask = ~np.isnan(y)
+    w = np.where(mask, weights[:, None], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (w * np.where(mask, y, 0.0)).sum(axis=0) / w.sum(axis=0)
+
+
+def fit_holt(y: np.ndarray, alpha: float, beta: float):
+    """Holt (Level + Trend pro Rasterschritt); Zeitschleife, vektorisiert über alle Items."""
+    level = np.full(y.shape[1], np.nan)
+    trend = np.zeros(y.shape[1])
+    for row in y:
+        valid = ~np.isnan(row)
+        init = valid & np.isnan(level)
+        level[init] = row[init]
+        upd = valid & ~init
+        prev = level[upd] + trend[upd]
+        new = alpha * row[upd] + (1 - alpha) * prev
+        trend[upd] = beta * (new - level[upd]) + (1 - beta) * trend[upd]
+        level[upd] = new
+    return level, trend
+
+
+def last_valid(y: np.ndarray) -> np.ndarray:
+    """Jüngster vorhandene Wert je Spalte (NaN, wenn die Spalte leer ist)."""
+    valid = ~np.isnan(y)
+    if not len(y):
+        return np.full(y.shape[1], np.nan)
+    row = len(y) - 1 - valid[::-1].argmax(axis=0)
+    return np.where(valid.any(axis=0), y[row, np.arange(y.shape[1])], np.nan)
+
+
+class ForecastEngine:
+    """Passt alle Modelle für eine ganze Watchlist in einem Durchgang an.
+
+    Grundlage ist die Matrix des ``PricePanel`` (Zeit × Items). Die Parameter
+    werden pro Panel-Stand gecacht und erst bei neuen Ticks neu geschätzt.
+    """
+
+    EWMA_ALPHA = 0.2
+    HOLT_ALPHA = 0.3
+    HOLT_BETA = 0.05
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, panel: PricePanel = None):
+        self.panel = panel or PricePanel.shared()
+        self._fits = {}    # (items, period, field) -> (panel-Stand, Parameter)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "ForecastEngine":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def fit(self, items, period: str = "day", field: str = "sell") -> dict:
+        items = tuple(items)
+        key = (items, period, field)
+        state = self.panel.version(items, period, field)
+        with self._lock:
+            hit = self._fits.get(key)
+        if hit is not None and hit[0] == state:
+            return hit[1]
+        grid, y = self.panel.matrix(items, period, field)
+        # Relativ zum Rasterende rechnen, sonst verliert die Regression Präzision
+        end = float(grid[-1]) if len(grid) else 0.0
+        x = grid - end
+        step = float(grid[1] - grid[0]) if len(grid) > 1 else 1.0
+        slope, intercept = fit_trend(x, y)
+        level, trend = fit_holt(y, self.HOLT_ALPHA, self.HOLT_BETA)
+        params = {
+            'items': items,
+            'end': end,
+            'step': step,
+            'last': last_valid(y),
+            'trend': (slope, intercept),
+            'ewma': fit_ewma(y, self.EWMA_ALPHA),
+            'holt': (level, trend),
+        }
+        with self._lock:
+            self._fits[key] = (state, params)
+        return params
+
+    def forecast(self, items, horizons, period: str = "day", field: str = "sell") -> pd.DataFrame:
+        """Vorhersagen aller Modelle für alle Items und Horizonte (Sekunden ab Datenende).
+
+        Ergebnis: MultiIndex (Item, Horizont) × Modelle.
+        """
+        p = self.fit(items, period, field)
+        h = np.asarray(horizons, dtype=np.float64)[:, None]     # H × 1
+        slope, intercept = p['trend']
+        level, trend = p['holt']
+        out = {
+            "Trend": slope * h + intercept,
+            "EWMA": np.broadcast_to(p['ewma'], (len(h), len(p['items']))),
+            "Holt": level + trend * (h / p['step']),
+        }
+        index = pd.MultiIndex.from_product([p['items'], h[:, 0]], names=['Item', 'Horizont'])
+        # Spalten item-major anordnen, passend zum MultiIndex
+        return pd.DataFrame({m: v.T.ravel() for m, v in out.items()}, index=index)
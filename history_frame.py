@@ -0,0 +1,103 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from time_parser import TimeParser
+
+# Steuersatz beim Verkauf über den Bazaar
+TAX_FACTOR = 0.98875
+
+
+def _frozen(values) -> np.ndarray:
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    arr.flags.writeable = False
+    return arr
+
+
+class HistoryFrame:
+    """Spaltenweise History eines Items, älteste Punkte zuerst.
+
+    Alle Spalten sind zusammenhängende, schreibgeschützte NumPy-Arrays; da
+    Frames aus dem API-Cache von mehreren Seiten geteilt werden, darf niemand
+    sie verändern. ``tail``/``slice`` liefern Views ohne Kopie.
+    """
+
+    def __init__(self, ts, buy, sell, buy_volume, sell_volume):
+        self.ts = _frozen(ts)                   # Unix-Sekunden (UTC)
+        self.buy = _frozen(buy)
+        self.sell = _frozen(sell)
+        self.buy_volume = _frozen(buy_volume)
+        self.sell_volume = _frozen(sell_volume)
+
+    @classmethod
+    def empty(cls) -> "HistoryFrame":
+        e = np.empty(0)
+        return cls(e, e, e, e, e)
+
+    @classmethod
+    def from_rows(cls, rows) -> "HistoryFrame":
+        """Aus Tupeln (ts, buy, sell, buyVolume, sellVolume)."""
+        if not rows:
+            return cls.empty()
+        cols = np.array(rows, dtype=np.float64).T
+        return cls(*cols)
+
+    @classmethod
+    def from_records(cls, points: list) -> "HistoryFrame":
+        """Aus der rohen API-Payload (Liste von Dicts, älteste zuerst)."""
+        ts = pd.to_datetime(pd.Index([p['timestamp'] for p in points], dtype=object),
+                            utc=True, format="ISO8601").as_unit('ns').asi8 / 1e9
+        get = lambda key: [p.get(key, np.nan) for p in points]
+        return cls(ts, get('buy'), get('sell'), get('buyVolume'), get('sellVolume'))
+
+    def __len__(self):
+        return len(self.ts)
+
+    def slice(self, start=None, stop=None) -> "HistoryFrame":
+        s = slice(start, stop)
+        return HistoryFrame(self.ts[s], self.buy[s], self.sell[s],
+                            self.buy_volume[s], self.sell_volume[s])
+
+    def tail(self, n: int) -> "HistoryFrame":
+        return self.slice(-n if n else len(self), None)
+
+    def between(self, start: float, end: float) -> "HistoryFrame":
+        """View aller Punkte mit start <= ts <= end (Unix-Sekunden)."""
+        lo = np.searchsorted(self.ts, start, side='left')
+        hi = np.searchsorted(self.ts, end, side='right')
+        return self.slice(lo, hi)
+
+    def take(self, idx) -> "HistoryFrame":
+        """Kopie mit den Punkten an den Indizes ``idx`` (z. B. nach Downsampling)."""
+        return HistoryFrame(self.ts[idx], self.buy[idx], self.sell[idx],
+                            self.buy_volume[idx], self.sell_volume[idx])
+
+    @cached_property
+    def version(self) -> tuple:
+        """Günstiger Inhaltsschlüssel; ändert sich, sobald neue Ticks dazukommen."""
+        if not len(self):
+            return (0,)
+        return (len(self), self.ts[0], self.ts[-1], self.buy[-1], self.sell[-1])
+
+    # --- abgeleitete Spalten, einmal pro Frame berechnet ---
+    @cached_property
+    def time(self) -> pd.DatetimeIndex:
+        """Lokale Uhrzeit (naiv) für Anzeige und Charts."""
+        return TimeParser.from_epoch_many(self.ts)
+
+    @cached_property
+    def margin(self) -> np.ndarray:
+        return _frozen(np.round(self.buy - self.sell, 1))
+
+    @cached_property
+    def margin_after_tax(self) -> np.ndarray:
+        return _frozen(np.round(self.buy * TAX_FACTOR - self.sell, 1))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'buy': self.buy,
+            'sell': self.sell,
+            'buy_volume': self.buy_volume,
+            'sell_volume': self.sell_volume,
+        }, index=self.time, copy=False)
@@ -0,0 +1,166 @@
+import sqlite3
+import threading
+
+from history_frame import HistoryFrame
+from time_parser import TimeParser
+
+# --- Lokaler Tick-Speicher (liegt neben portfolio.db) ---
+HISTORY_DB_PATH = 'history.db'
+
+# Fensterlänge der History-Endpunkte in Sekunden
+PERIOD_SECONDS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+# Ungefähre Auflösung je Periode = Mindestabstand zwischen zwei Nachladevorgängen
+PERIOD_STEP = {"hour": 10, "day": 300, "week": 3600}
+
+# Spalten, die pro Snapshot gespeichert werden
+FIELDS = ("buy", "sell", "buyVolume", "sellVolume", "maxBuy", "maxSell", "minBuy", "minSell")
+
+
+class HistoryStore:
+    """Speichert jeden gesehenen Snapshot pro Item und Periode in SQLite."""
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = HISTORY_DB_PATH):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        cols = ", ".join(f"{f} REAL" for f in FIELDS)
+        with self.lock, self.conn:
+            self.conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS ticks (
+                    item TEXT,
+                    period TEXT,
+                    ts REAL,
+                    timestamp TEXT,
+                    {cols},
+                    PRIMARY KEY (item, period, ts)
+                ) WITHOUT ROWID
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    item TEXT,
+                    period TEXT,
+                    last_sync REAL,
+                    PRIMARY KEY (item, period)
+                )
+            ''')
+            # Für periodenweite Abfragen über alle Items (Marktscanner)
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_ticks_period_ts ON ticks (period, ts)')
+
+    @classmethod
+    def shared(cls) -> "HistoryStore":
+        # Eine Instanz pro Prozess, damit alle Seiten dieselbe Verbindung nutzen
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def last_timestamp(self, item: str, period: str):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT MAX(ts) FROM ticks WHERE item=? AND period=?', (item, period)
+            ).fetchone()
+        return row[0]
+
+    def last_sync(self, item: str, period: str):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT last_sync FROM sync_state WHERE item=? AND period=?', (item, period)
+            ).fetchone()
+        return row[0] if row else None
+
+    def append(self, item: str, period: str, points: list, synced_at: float, min_gap: float = 0):
+        """Fügt neue Punkte ein und gibt die Anzahl wirklich neuer Ticks zurück.
+
+        Bereits bekannte Zeitstempel werden ignoriert.
+        ``min_gap`` dünnt Punkte aus, die dichter als die Periodenauflösung liegen.
+        """
+        rows = []
+        prev = self.last_timestamp(item, period) if min_gap else None
+        for p in sorted(points, key=lambda d: d['timestamp']):
+            ts = TimeParser.to_epoch(p['timestamp'])
+            if prev is not None and ts - prev < min_gap:
+                continue
+            rows.append((item, period, ts, p['timestamp'], *(p.get(f) for f in FIELDS)))
+            prev = ts
+        placeholders = ",".join("?" * (4 + len(FIELDS)))
+        with self.lock, self.conn:
+            inserted = self.conn.executemany(
+                f'INSERT OR IGNORE INTO ticks VALUES ({placeholders})', rows
+            ).rowcount
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sync_state (item, period, last_sync) VALUES (?,?,?)',
+                (item, period, synced_at)
+            )
+        return max(inserted, 0)
+
+    def latest(self, item: str, period: str):
+        """Nur der jüngste Tick (oder None) – ohne das ganze Fenster zu laden."""
+        with self.lock:
+            row = self.conn.execute(
+                '''
+                SELECT timestamp, buy, sell FROM ticks
+                WHERE item=? AND period=? ORDER BY ts DESC LIMIT 1
+                ''',
+                (item, period)
+            ).fetchone()
+        return dict(zip(("timestamp", "buy", "sell"), row)) if row else None
+
+    def load(self, item: str, period: str) -> HistoryFrame:
+        """Alle Punkte im Periodenfenster als spaltenweiser Frame, älteste zuerst."""
+        with self.lock:
+            cur = self.conn.execute(
+                '''
+                SELECT ts, buy, sell, buyVolume, sellVolume FROM ticks
+                WHERE item=? AND period=?
+                  AND ts >= (SELECT MAX(ts) FROM ticks WHERE item=? AND period=?) - ?
+                ORDER BY ts
+                ''',
+                (item, period, item, period, PERIOD_SECONDS[period])
+            )
+            rows = cur.fetchall()
+        return HistoryFrame.from_rows(rows)
+
+    def items(self, period: str) -> list:
+        """Alle Items, für die Ticks dieser Periode gespeichert sind."""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT DISTINCT item FROM ticks WHERE period=? ORDER BY item', (period,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def load_all(self, item: str, period: str) -> HistoryFrame:
+        """Die komplette gespeicherte Historie (nicht nur das Periodenfenster)."""
+        with self.lock:
+            rows = self.conn.execute(
+                '''
+                SELECT ts, buy, sell, buyVolume, sellVolume FROM ticks
+                WHERE item=? AND period=? ORDER BY ts
+                ''',
+                (item, period)
+            ).fetchall()
+        return HistoryFrame.from_rows(rows)
+
+    def changed_since(self, period: str, synced_after: float, field: str = "sell"):
+        """Fenster-Ticks aller Items, die nach ``synced_after`` synchronisiert wurden.
+
+        Eine Abfrage für den ganzen Markt; gibt (Zeilen (item, ts, wert), letzter Sync) zurück.
+        """
+        if field not in FIELDS:
+            raise ValueError(f"Unbekanntes Feld: {field}")
+        with self.lock:
+            rows = self.conn.execute(
+                f'''
+                SELECT item, ts, {field} FROM ticks
+                WHERE period=?
+                  AND item IN (SELECT item FROM sync_state WHERE period=? AND last_sync > ?)
+                  AND ts >= (SELECT MAX(ts) FROM ticks WHERE period=?) - ?
+                ORDER BY item, ts
+                ''',
+                (period, period, synced_after, period, PERIOD_SECONDS[period])
+            ).fetchall()
+            newest = self.conn.execute(
+                'SELECT MAX(last_sync) FROM sync_state WHERE period=?', (period,)
+            ).fetchone()[0]
+        return rows, newest
@@ -0,0 +1,153 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+from history_frame import HistoryFrame
+
+
+class RollingStats:
+    """Gleitender Mittelwert/Varianz über die letzten ``size`` Werte (Welford).
+
+    ``push`` ist O(1): der neue Wert wird addiert, der herausfallende entfernt.
+    Gegen Rundungsdrift wird in großen Abständen exakt neu berechnet.
+    """
+
+    RESYNC_EVERY = 10_000
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._pushes = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def push(self, x: float):
+        self.values.append(x)
+        n = len(self.values)
+        delta = x - self.mean
+        self.mean += delta / n
+        self._m2 += delta * (x - self.mean)
+        if n > self.size:
+            old = self.values.popleft()
+            n -= 1
+            delta = old - self.mean
+            self.mean -= delta / n
+            self._m2 -= delta * (old - self.mean)
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            arr = np.fromiter(self.values, dtype=np.float64)
+            self.mean = float(arr.mean())
+            self._m2 = float(((arr - self.mean) ** 2).sum())
+
+    @property
+    def var(self) -> float:
+        # Stichprobenvarianz (ddof=1) wie pandas.rolling().std() und statistics.stdev
+        n = len(self.values)
+        return max(self._m2, 0.0) / (n - 1) if n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+
+class EMA:
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+
+    def push(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class IndicatorState:
+    """Laufender Zustand einer Zeitreihe: Bollinger-Bänder, EMA und Abweichung.
+
+    ``baseline`` ist (Ø, σ) des vollen Fensters *vor* dem letzten Wert, ``pct``
+    die prozentuale Abweichung des letzten Werts davon – exakt die Größen, die
+    das Dashboard für seine Schwellen braucht.
+    """
+
+    def __init__(self, window: int, k: float = 2, ema_span: int = None, keep: int = 50_000):
+        self.k = k
+        self.stats = RollingStats(window)
+        self.ema = EMA(ema_span or window)
+        self.last_ts = -math.inf
+        self.last = None
+        self.baseline = (0.0, 0.0)
+        self.pct = 0.0
+        # Verlauf der Ausgaben für Charts (ts, GD, oberes, unteres Band, EMA)
+        self.history = deque(maxlen=keep)
+
+    def push(self, ts: float, x: float):
+        if self.stats.full:
+            self.baseline = (self.stats.mean, self.stats.std)
+        else:
+            self.baseline = (0.0, 0.0)
+        avg = self.baseline[0]
+        self.pct = ((x - avg) / avg * 100) if avg else 0.0
+        self.stats.push(x)
+        ema = self.ema.push(x)
+        if self.stats.full:
+            ma, sd = self.stats.mean, self.stats.std
+            self.history.append((ts, ma, ma + self.k * sd, ma - self.k * sd, ema))
+        else:
+            self.history.append((ts, math.nan, math.nan, math.nan, ema))
+        self.last_ts = ts
+        self.last = x
+
+    def series(self, since: float = -math.inf):
+        """Bänder ab ``since`` als Arrays: ts, GD, GD+kσ, GD-kσ, EMA."""
+        if not self.history:
+            return tuple(np.empty(0) for _ in range(5))
+        arr = np.array(self.history, dtype=np.float64)
+        start = np.searchsorted(arr[:, 0], since, side='left')
+        return tuple(arr[start:, i] for i in range(5))
+
+
+class IndicatorEngine:
+    """Hält pro (Item, Periode, Feld, Fenster) einen IndicatorState über Reruns hinweg.
+
+    ``feed`` schiebt nur Ticks nach, die neuer sind als der zuletzt gesehene,
+    damit die Kosten pro Rerun nicht mit der History-Länge wachsen.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.states = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "IndicatorEngine":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def feed(self, item: str, period: str, field: str, frame: HistoryFrame,
+             window: int, k: float = 2, ema_span: int = None, on_push=None) -> IndicatorState:
+        """Neue Ticks einspeisen; ``on_push(state)`` läuft nach jedem einzelnen Tick."""
+        key = (item, period, field, window, k, ema_span)
+        with self._lock:
+            state = self.states.get(key)
+            if state is None:
+                state = self.states[key] = IndicatorState(window, k, ema_span)
+            values = getattr(frame, field)
+            start = np.searchsorted(frame.ts, state.last_ts, side='right')
+            for ts, x in zip(frame.ts[start:].tolist(), values[start:].tolist()):
+                if x == x:              # NaN (fehlende Werte) überspringen
+                    state.push(ts, x)
+                    if on_push is not None:
+                        on_push(state)
+        return state
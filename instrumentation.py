@@ -0,0 +1,251 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:         # Windows: kein Spitzen-Speicher
+    resource = None
+
+# Prometheus-Textdatei bzw. Port für /metrics; beides aus, solange nicht gesetzt
+METRICS_FILE = os.environ.get("BAZAAR_METRICS_FILE")
+METRICS_PORT = os.environ.get("BAZAAR_METRICS_PORT")
+
+# Bucket-Grenzen (obere Schranken, inklusive)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HELP = {
+    "page_render_seconds": "Dauer von render() je Seite",
+    "bazaar_upstream_seconds": "Latenz der Upstream-Anfragen je Endpunkt",
+    "bazaar_payload_bytes": "Größe der Upstream-Antworten je Endpunkt",
+    "bazaar_upstream_errors_total": "Fehlgeschlagene Upstream-Anfragen je Endpunkt",
+    "bazaar_upstream_requests_total": "Upstream-Anfragen je Endpunkt",
+    "bazaar_api_calls_total": "Aufrufe der BazaarAPI-Methoden (inkl. Cache-Treffer)",
+    "rerun_api_calls": "BazaarAPI-Aufrufe pro Streamlit-Rerun je Seite",
+    "rerun_upstream_requests": "Upstream-Anfragen pro Streamlit-Rerun je Seite",
+    "bazaar_cache": "Kennzahlen des geteilten API-Caches",
+    "process_resident_memory_bytes": "Aktueller Arbeitsspeicher des Prozesses",
+    "process_peak_memory_bytes": "Höchster Arbeitsspeicher seit Prozessstart",
+}
+
+
+def _num(value) -> str:
+    # Ganzzahlen ohne Exponent, sonst volle Genauigkeit
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)      # letzter Eintrag = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Schätzung aus den Buckets (lineare Interpolation innerhalb des Buckets)."""
+        if not self.count:
+            return float("nan")
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class Metrics:
+    """Prozessweite Zähler, Gauges und Histogramme mit Prometheus-Export.
+
+    Bewusst ohne Streamlit-Abhängigkeit: Collector, Alarm-Dienst und Seiten
+    schreiben in dieselbe Instanz.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.counters = {}      # (name, labels) -> float
+        self.gauges = {}
+        self.histograms = {}
+        # Callables, die vor jedem Auslesen Gauges auffrischen (z. B. Cache-Statistik)
+        self.collectors = [Metrics.sample_process]
+        self._lock = threading.Lock()
+        self._local = threading.local()     # laufender Rerun je Thread
+
+    @classmethod
+    def shared(cls) -> "Metrics":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def total(self, name: str) -> float:
+        """Summe eines Zählers über alle Labels."""
+        with self._lock:
+            return sum(v for (n, _), v in self.counters.items() if n == name)
+
+    @contextmanager
+    def rerun(self, page: str):
+        """Misst einen Rerun und zählt die API-Aufrufe darin.
+
+        Die Zählung ist eine Differenz der prozessweiten Zähler; Collector und
+        parallele Sessions fließen mit ein. Verschachtelte Aufrufe im selben
+        Thread (z. B. ein Fragment während des Seiten-Reruns) zählen nur zur
+        äußeren Messung; eigene Werte gibt es nur, wenn sie allein laufen.
+        """
+        if getattr(self._local, "page", None) is not None:
+            yield
+            return
+        self._local.page = page
+        calls = self.total("bazaar_api_calls_total")
+        upstream = self.total("bazaar_upstream_requests_total")
+        try:
+            with self.timer("page_render_seconds", page=page):
+                yield
+        finally:
+            self._local.page = None
+            self.observe("rerun_api_calls", self.total("bazaar_api_calls_total") - calls,
+                         buckets=COUNT_BUCKETS, page=page)
+            self.observe("rerun_upstream_requests", self.total("bazaar_upstream_requests_total") - upstream,
+                         buckets=COUNT_BUCKETS, page=page)
+
+    def sample_process(self):
+        """Speicher-Gauges auffrischen, soweit die Plattform sie liefert (RSS aus /proc)."""
+        if resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Linux meldet KiB, macOS Bytes
+            self.set("process_peak_memory_bytes", peak if sys.platform == "darwin" else peak * 1024)
+        try:
+            with open("/proc/self/statm") as fh:
+                rss_pages = int(fh.read().split()[1])
+            self.set("process_resident_memory_bytes", rss_pages * os.sysconf("SC_PAGE_SIZE"))
+        except (OSError, ValueError):
+            pass
+
+    def add_collector(self, fn):
+        """``fn(metrics)`` wird vor jedem Export bzw. Snapshot aufgerufen."""
+        self.collectors.append(fn)
+
+    def refresh(self):
+        for fn in list(self.collectors):
+            fn(self)
+
+    def snapshot(self):
+        """Kopie aller Werte für die Diagnose-Seite."""
+        self.refresh()
+        with self._lock:
+            return dict(self.counters), dict(self.gauges), {
+                k: (h.count, h.sum, h.quantile(0.5), h.quantile(0.95)) for k, h in self.histograms.items()
+            }
+
+    # --- Prometheus-Textformat ---
+    @staticmethod
+    def _labels(labels, extra=()) -> str:
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+    def prometheus(self) -> str:
+        self.refresh()
+        lines, typed = [], set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{self._labels(labels)} {_num(value)}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                header(name, "gauge")
+                lines.append(f"{name}{self._labels(labels)} {_num(value)}")
+            for (name, labels), hist in sorted(self.histograms.items()):
+                header(name, "histogram")
+                cumulative = 0
+                for bound, n in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+                    cumulative += n
+                    le = bound if bound == "+Inf" else f"{bound:g}"
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{self._labels(labels)} {_num(hist.sum)}")
+                lines.append(f"{name}_count{self._labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        # Atomar ersetzen, damit ein Scraper (z. B. node_exporter textfile) nie eine halbe Datei liest
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.prometheus())
+        os.replace(tmp, path)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1", metrics: Metrics = None) -> ThreadingHTTPServer:
+    """Stellt ``/metrics`` in einem Daemon-Thread bereit."""
+    metrics = metrics or Metrics.shared()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from bazaar_api import BazaarAPI
+from time_parser import TimeParser
+
+# Standardfenster der Rangliste
+WINDOW_SECONDS = 24 * 3600
+
+
+def _order_key(order: dict) -> tuple:
+    raw_ts = order.get("timestamp") or order.get("time") or order.get("createdTimestamp", "")
+    qty = order.get("quantity", 0)
+    price = order.get("price", order.get("unit_price", 0))
+    return raw_ts, qty, price
+
+
+class LeaderboardEngine:
+    """Handelsvolumen vieler Spieler über ein gleitendes Zeitfenster.
+
+    Orders aller Spieler werden parallel geladen (über den API-Cache). Maßgeblich
+    ist immer die aktuelle Payload: stornierte oder geänderte Orders fallen
+    heraus, erneut gelieferte werden nicht doppelt gezählt. Geparst werden nur
+    Orders, die neu in der Payload auftauchen; die Rangliste ist danach eine
+    einzige ``bincount``-Aggregation.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, api: BazaarAPI = None):
+        self.api = api or BazaarAPI()
+        self._players = {}    # player -> dict(payload, parsed, ts, value)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "LeaderboardEngine":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def update(self, players):
+        """Orders der ``players`` neu laden (parallel) und übernehmen."""
+        payloads = self.api.get_player_orders_many(players)
+        with self._lock:
+            for player, orders in payloads.items():
+                self._merge(player, orders or [])
+
+    def _merge(self, player: str, orders: list):
+        entry = self._players.setdefault(player, {
+            'payload': None, 'parsed': {}, 'ts': np.empty(0), 'value': np.empty(0),
+        })
+        # Gleiches Objekt aus dem TTL-Cache: nichts Neues
+        if orders is entry['payload']:
+            return
+        entry['payload'] = orders
+        # Identische Orders mitzählen: Schlüssel bekommt die laufende Nummer des Duplikats
+        keys, counts = [], {}
+        for order in orders:
+            key = _order_key(order)
+            counts[key] = counts.get(key, 0) + 1
+            keys.append(key + (counts[key],))
+        parsed = entry['parsed']
+        new = [k for k in keys if k not in parsed]
+        if new:
+            raw_ts, qty, price, _ = zip(*new)
+            ts = TimeParser.to_epoch_many(raw_ts)
+            value = np.asarray(qty, dtype=np.float64) * np.asarray(price, dtype=np.float64)
+            parsed.update(zip(new, zip(ts.tolist(), value.tolist())))
+        # Nur Orders der aktuellen Payload behalten: verschwundene fallen heraus
+        entry['parsed'] = {k: parsed[k] for k in keys}
+        pairs = np.array(list(entry['parsed'].values()), dtype=np.float64).reshape(-1, 2)
+        entry['ts'] = np.ascontiguousarray(pairs[:, 0])
+        entry['value'] = np.ascontiguousarray(pairs[:, 1])
+
+    def volumes(self, players, window: float = WINDOW_SECONDS, now: float = None) -> pd.DataFrame:
+        """Volumen und Anzahl Orders je Spieler im Fenster, absteigend sortiert."""
+        now = time.time() if now is None else now
+        players = list(dict.fromkeys(players))
+        self.update(players)
+        with self._lock:
+            entries = [self._players[p] for p in players]
+            ts = np.concatenate([e['ts'] for e in entries]) if entries else np.empty(0)
+            value = np.concatenate([e['value'] for e in entries]) if entries else np.empty(0)
+            codes = np.repeat(np.arange(len(players)), [len(e['ts']) for e in entries])
+        inside = ts >= now - window
+        return pd.DataFrame({
+            'Volumen': np.bincount(codes[inside], weights=value[inside], minlength=len(players)),
+            'Orders': np.bincount(codes[inside], minlength=len(players)),
+        }, index=pd.Index(players, name='player')).sort_values('Volumen', ascending=False)
@@ -0,0 +1,300 @@
+import sqlite3
+from datetime import date, timedelta
+
+# --- Schema-Migrationen ---
+# Jede Migration läuft genau einmal; der Stand steht in PRAGMA user_version.
+# Neue Schritte immer hinten anhängen, nie bestehende ändern.
+MIGRATIONS = [
+    # 1: Ausgangsschema (existierende Datenbanken haben es bereits)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS portfolio (
+            id INTEGER PRIMARY KEY,
+            item TEXT,
+            quantity REAL,
+            buy_price REAL,
+            timestamp TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY,
+            item TEXT,
+            quantity REAL,
+            sale_price REAL,
+            sale_value REAL,
+            timestamp TEXT
+        )
+        ''',
+    ],
+    # 2: Indizes für Item-Filter und Zeitbereichs-Abfragen
+    [
+        'CREATE INDEX IF NOT EXISTS idx_portfolio_item ON portfolio (item)',
+        'CREATE INDEX IF NOT EXISTS idx_portfolio_timestamp ON portfolio (timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_item ON sales (item)',
+        'CREATE INDEX IF NOT EXISTS idx_sales_timestamp ON sales (timestamp)',
+    ],
+    # 3: FIFO-Lots und materialisierte Positionen
+    [
+        # Restmenge je Kauf-Lot; verkaufte Lots bleiben für die Kostenbasis erhalten
+        'ALTER TABLE portfolio ADD COLUMN remaining REAL',
+        'UPDATE portfolio SET remaining = quantity',
+        'CREATE INDEX IF NOT EXISTS idx_portfolio_open ON portfolio (item, timestamp, id) WHERE remaining > 0',
+        # NULL = Altbestand ohne Lot-Zuordnung (wird bei Neuberechnung übersprungen)
+        'ALTER TABLE sales ADD COLUMN cost_basis REAL',
+        '''
+        CREATE TABLE IF NOT EXISTS sale_lots (
+            sale_id INTEGER,
+            lot_id INTEGER,
+            quantity REAL,
+            cost REAL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_sale_lots_sale ON sale_lots (sale_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sale_lots_lot ON sale_lots (lot_id)',
+        '''
+        CREATE TABLE IF NOT EXISTS positions (
+            item TEXT PRIMARY KEY,
+            quantity REAL,
+            cost REAL,
+            realized_pnl REAL,
+            sold_quantity REAL
+        )
+        ''',
+        '''
+        INSERT OR REPLACE INTO positions (item, quantity, cost, realized_pnl, sold_quantity)
+        SELECT item, SUM(quantity), SUM(quantity * buy_price), 0, 0
+        FROM portfolio GROUP BY item
+        ''',
+    ],
+]
+
+# Bazaar-Steuer beim Verkauf
+SALE_TAX = 0.01125
+# Toleranz für Rundungsreste bei Teilmengen
+EPS = 1e-9
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Öffnet die Ledger-Datenbank im WAL-Modus und bringt das Schema auf Stand."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # WAL: Leser blockieren Schreiber nicht (und umgekehrt)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    migrate(conn)
+    return conn
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection):
+    version = schema_version(conn)
+    for target, steps in enumerate(MIGRATIONS[version:], start=version + 1):
+        with conn:
+            for sql in steps:
+                conn.execute(sql)
+            # PRAGMA akzeptiert keine Parameter
+            conn.execute(f'PRAGMA user_version = {int(target)}')
+
+
+def insert_many(conn: sqlite3.Connection, table: str, columns, rows) -> int:
+    """Viele Zeilen in einer einzigen Transaktion einfügen."""
+    cols = ", ".join(columns)
+    placeholders = ",".join("?" * len(columns))
+    with conn:
+        cur = conn.executemany(f'INSERT INTO {table} ({cols}) VALUES ({placeholders})', rows)
+    return cur.rowcount
+
+
+def day_range(day: date):
+    """Halboffener ISO-Bereich [Tag, Folgetag) – indexfähig statt date(timestamp)=?."""
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
+# --- Positionen & FIFO-Lots ---
+def record_buy(conn: sqlite3.Connection, item: str, qty: float, price: float, ts: str) -> int:
+    """Neues Lot anlegen und die Position inkrementell fortschreiben."""
+    with conn:
+        cur = conn.execute(
+            'INSERT INTO portfolio (item, quantity, buy_price, timestamp, remaining) VALUES (?,?,?,?,?)',
+            (item, qty, price, ts, qty)
+        )
+        _add_to_position(conn, item, qty, qty * price)
+    return cur.lastrowid
+
+
+def _add_to_position(conn, item, qty, cost):
+    conn.execute(
+        '''
+        INSERT INTO positions (item, quantity, cost, realized_pnl, sold_quantity)
+        VALUES (?,?,?,0,0)
+        ON CONFLICT(item) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            cost = cost + excluded.cost
+        ''',
+        (item, qty, cost)
+    )
+
+
+def record_sale(conn: sqlite3.Connection, item: str, qty: float, price: float, ts: str) -> int:
+    """Verkauf gegen die ältesten offenen Lots buchen (FIFO); Teilverkäufe erlaubt."""
+    with conn:
+        lots = conn.execute(
+            '''
+            SELECT id, remaining, buy_price FROM portfolio
+            WHERE item = ? AND remaining > 0 ORDER BY timestamp, id
+            ''',
+            (item,)
+        ).fetchall()
+        lots = [list(lot) for lot in lots]
+        available = sum(r for _, r, _ in lots)
+        if qty > available + EPS:
+            raise ValueError(f"Nur {available:g} {item} im Bestand, Verkauf von {qty:g} nicht möglich")
+        sale_id = conn.execute(
+            'INSERT INTO sales (item, quantity, sale_price, sale_value, timestamp) VALUES (?,?,?,?,?)',
+            (item, qty, price, qty * price, ts)
+        ).lastrowid
+        cost = _match_fifo(conn, sale_id, qty, lots)
+        conn.execute('UPDATE sales SET cost_basis = ? WHERE id = ?', (cost, sale_id))
+        conn.execute(
+            '''
+            UPDATE positions SET
+                quantity = quantity - ?,
+                cost = cost - ?,
+                realized_pnl = realized_pnl + ?,
+                sold_quantity = sold_quantity + ?
+            WHERE item = ?
+            ''',
+            (qty, cost, qty * price * (1 - SALE_TAX) - cost, qty, item)
+        )
+    return sale_id
+
+
+def _match_fifo(conn, sale_id, qty, lots) -> float:
+    """Verbraucht ``qty`` aus ``lots`` ([id, remaining, buy_price], wird fortgeschrieben).
+
+    Gibt die Kostenbasis zurück; ``ValueError``, wenn die Lots nicht reichen.
+    """
+    left, cost = qty, 0.0
+    updates, matches = [], []
+    for lot in lots:
+        if left <= EPS:
+            break
+        lot_id, remaining, buy_price = lot
+        take = min(remaining, left)
+        lot[1] = remaining - take
+        updates.append((lot[1], lot_id))
+        matches.append((sale_id, lot_id, take, take * buy_price))
+        cost += take * buy_price
+        left -= take
+    if left > EPS:
+        # Ungedeckter Rest würde die Kostenbasis stillschweigend senken
+        raise ValueError(f"Verkauf {sale_id}: {left:g} Einheiten ohne Bestand")
+    conn.executemany('UPDATE portfolio SET remaining = ? WHERE id = ?', updates)
+    conn.executemany(
+        'INSERT INTO sale_lots (sale_id, lot_id, quantity, cost) VALUES (?,?,?,?)', matches
+    )
+    return cost
+
+
+def rebuild_positions(conn: sqlite3.Connection, items):
+    """Lots, Zuordnungen und Position einzelner Items aus dem Ledger neu aufbauen.
+
+    Nur nötig, wenn sich die Historie ändert (Löschen, Import); normale Käufe
+    und Verkäufe schreiben die Positionen inkrementell fort.
+    """
+    with conn:
+        _rebuild(conn, items)
+
+
+def _rebuild(conn, items):
+    # Ohne eigene Transaktion, damit Löschen und Neuaufbau atomar bleiben
+    for item in set(items):
+        conn.execute('UPDATE portfolio SET remaining = quantity WHERE item = ?', (item,))
+        conn.execute(
+            'DELETE FROM sale_lots WHERE sale_id IN (SELECT id FROM sales WHERE item = ?)', (item,)
+        )
+        lots = [list(r) for r in conn.execute(
+            'SELECT id, quantity, buy_price FROM portfolio WHERE item = ? ORDER BY timestamp, id',
+            (item,)
+        )]
+        sales = conn.execute(
+            '''
+            SELECT id, quantity, sale_price FROM sales
+            WHERE item = ? AND cost_basis IS NOT NULL ORDER BY timestamp, id
+            ''',
+            (item,)
+        ).fetchall()
+        realized = sold = 0.0
+        for sale_id, qty, price in sales:
+            cost = _match_fifo(conn, sale_id, qty, [lot for lot in lots if lot[1] > EPS])
+            conn.execute('UPDATE sales SET cost_basis = ? WHERE id = ?', (cost, sale_id))
+            realized += qty * price * (1 - SALE_TAX) - cost
+            sold += qty
+        quantity = sum(lot[1] for lot in lots)
+        cost = sum(lot[1] * lot[2] for lot in lots)
+        conn.execute(
+            '''
+            INSERT OR REPLACE INTO positions (item, quantity, cost, realized_pnl, sold_quantity)
+            VALUES (?,?,?,?,?)
+            ''',
+            (item, quantity, cost, realized, sold)
+        )
+
+
+def check_coverage(conn: sqlite3.Connection, items):
+    """``ValueError``, wenn FIFO-Verkäufe eines Items die gekaufte Menge übersteigen."""
+    for item in sorted(set(items)):
+        bought = conn.execute(
+            'SELECT COALESCE(SUM(quantity), 0) FROM portfolio WHERE item = ?', (item,)
+        ).fetchone()[0]
+        sold = conn.execute(
+            'SELECT COALESCE(SUM(quantity), 0) FROM sales WHERE item = ? AND cost_basis IS NOT NULL',
+            (item,)
+        ).fetchone()[0]
+        if sold > bought + EPS:
+            raise ValueError(f"{item}: {sold:g} verkauft, aber nur {bought:g} gekauft")
+
+
+def _items_of(conn, table: str, ids) -> list:
+    rows = conn.execute(
+        f'SELECT DISTINCT item FROM {table} WHERE id IN ({",".join("?" * len(ids))})', ids
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def delete_sales(conn: sqlite3.Connection, sale_ids) -> int:
+    """Verkäufe samt Lot-Zuordnung löschen und die betroffenen Positionen neu aufbauen."""
+    ids = [int(i) for i in sale_ids]
+    if not ids:
+        return 0
+    marks = ",".join("?" * len(ids))
+    with conn:
+        items = _items_of(conn, 'sales', ids)
+        conn.execute(f'DELETE FROM sale_lots WHERE sale_id IN ({marks})', ids)
+        deleted = conn.execute(f'DELETE FROM sales WHERE id IN ({marks})', ids).rowcount
+        _rebuild(conn, items)
+    return deleted
+
+
+def delete_lots(conn: sqlite3.Connection, lot_ids) -> int:
+    """Kauf-Lots löschen; Lots, gegen die schon verkauft wurde, werden abgelehnt."""
+    ids = [int(i) for i in lot_ids]
+    if not ids:
+        return 0
+    marks = ",".join("?" * len(ids))
+    with conn:
+        used = [r[0] for r in conn.execute(
+            f'SELECT DISTINCT lot_id FROM sale_lots WHERE lot_id IN ({marks}) ORDER BY lot_id', ids
+        )]
+        if used:
+            raise ValueError(
+                f"Lot(s) {', '.join(map(str, used))} sind Verkäufen zugeordnet – "
+                "bitte zuerst die zugehörigen Verkäufe löschen"
+            )
+        items = _items_of(conn, 'portfolio', ids)
+        deleted = conn.execute(f'DELETE FROM portfolio WHERE id IN ({marks})', ids).rowcount
+        _rebuild(conn, items)
+    return deleted
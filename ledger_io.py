@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pandas as pd
+
+import ledger_db
+
+# Zeilen pro Chunk beim Streamen von Import und Export
+CHUNK_ROWS = 50_000
+
+# Pflicht- und optionale Spalten je Tabelle (Reihenfolge = Insert-Reihenfolge)
+COLUMNS = {
+    'portfolio': ['item', 'quantity', 'buy_price', 'timestamp'],
+    'sales': ['item', 'quantity', 'sale_price', 'sale_value', 'timestamp'],
+}
+REQUIRED = {
+    'portfolio': {'item', 'quantity', 'buy_price'},
+    'sales': {'item', 'quantity', 'sale_price'},
+}
+
+
+def _iter_chunks(source, fmt: str, chunksize: int):
+    if fmt == 'csv':
+        yield from pd.read_csv(source, chunksize=chunksize)
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq     # optional, nur für Parquet nötig
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+
+
+def _prepare(table: str, chunk: pd.DataFrame) -> pd.DataFrame:
+    missing = REQUIRED[table] - set(chunk.columns)
+    if missing:
+        raise ValueError(f"Spalten fehlen für {table}: {', '.join(sorted(missing))}")
+    chunk = chunk.copy()
+    if 'timestamp' not in chunk:
+        chunk['timestamp'] = datetime.utcnow().isoformat()
+    else:
+        # Gemischte Angaben (Z, Offset, naiv = UTC) einheitlich als naive UTC-Zeit speichern
+        chunk['timestamp'] = pd.to_datetime(chunk['timestamp'], format="ISO8601", utc=True) \
+            .dt.tz_localize(None).dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+    if table == 'portfolio':
+        chunk['remaining'] = chunk['quantity']
+        return chunk[COLUMNS[table] + ['remaining']]
+    if 'sale_value' not in chunk:
+        chunk['sale_value'] = chunk['quantity'] * chunk['sale_price']
+    # Importierte Verkäufe nehmen an der FIFO-Zuordnung teil (Kosten folgen im Rebuild)
+    chunk['cost_basis'] = 0.0
+    return chunk[COLUMNS[table] + ['cost_basis']]
+
+
+def import_ledger(conn, table: str, source, fmt: str = 'csv', chunksize: int = CHUNK_ROWS) -> int:
+    """Streamt CSV/Parquet chunkweise in ``portfolio`` oder ``sales``.
+
+    Alle Chunks laufen in einer Transaktion – ein fehlerhafter Chunk verwirft
+    den ganzen Import, ebenso Verkäufe, die kein Bestand deckt. Danach werden
+    Lots und Positionen der betroffenen Items einmal neu aufgebaut.
+    """
+    total, items = 0, set()
+    with conn:
+        for chunk in _iter_chunks(source, fmt, chunksize):
+            rows = _prepare(table, chunk)
+            cols = ", ".join(rows.columns)
+            placeholders = ",".join("?" * len(rows.columns))
+            conn.executemany(
+                f'INSERT INTO {table} ({cols}) VALUES ({placeholders})',
+                rows.itertuples(index=False, name=None)
+            )
+            items.update(rows['item'].unique())
+            total += len(rows)
+        ledger_db.check_coverage(conn, items)
+    ledger_db.rebuild_positions(conn, items)
+    return total
+
+
+def export_ledger(conn, table: str, dest, fmt: str = 'csv', chunksize: int = CHUNK_ROWS) -> int:
+    """Schreibt eine Tabelle chunkweise nach ``dest`` (Pfad oder Datei-Objekt)."""
+    if table not in COLUMNS:
+        raise ValueError(f"Unbekannte Tabelle: {table}")
+    chunks = pd.read_sql(f'SELECT * FROM {table} ORDER BY id', conn, chunksize=chunksize)
+    total = 0
+    if fmt == 'csv':
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(dest, index=False, header=(i == 0), mode='w' if i == 0 else 'a')
+            total += len(chunk)
+    elif fmt == 'parquet':
+        import pyarrow as pa               # optional, nur für Parquet nötig
+        import pyarrow.parquet as pq
+        # Schema aus den SQLite-Spaltentypen, damit leere Spalten nicht zu "null" werden
+        types = {'INTEGER': pa.int64(), 'REAL': pa.float64(), 'TEXT': pa.string()}
+        schema = pa.schema([
+            (name, types.get(decl.upper(), pa.string()))
+            for _, name, decl, *_ in conn.execute(f'PRAGMA table_info({table})')
+        ])
+        with pq.ParquetWriter(dest, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                total += len(chunk)
+    else:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    return total
@@ -9,35 +9,72 @@ from chart_analysis import ChartAnalysis
 from forecast import Forecast
 from settings import Settings
 from recommendations import Recommendations
-
-# Automatische Seitenaktualisierung
-st_autorefresh(interval=20 * 1000, limit=None, key="datarefresh")
+from collector import Collector
+from alerts import AlertEngine, FileSink, LogSink, load_config
+from diagnostics import Diagnostics
+from instrumentation import METRICS_FILE, METRICS_PORT, Metrics, serve_metrics
 
 st.set_page_config(page_title="Bazaar Tracker", layout="wide")
 
+@st.cache_resource
+def start_collector(items):
+    # Einmal pro Server: pollt unabhängig von der Zahl offener Sessions
+    collector = Collector(BazaarAPI())
+    collector.track(items)
+    # Alarme laufen im Collector-Thread, unabhängig von offenen Sessions
+    collector.subscribe(AlertEngine(collector.api, [LogSink(), FileSink()]).on_ticks)
+    collector.start()
+    return collector
+
+@st.cache_resource
+def start_metrics_endpoint(port):
+    # Optionaler /metrics-Endpunkt für Prometheus, einmal pro Server
+    return serve_metrics(port)
+
 api = BazaarAPI()
+dashboard = Dashboard(api)
 pages = {
-    "Dashboard": Dashboard(api),
+    "Dashboard": dashboard,
     "Portfolio": Portfolio(),
     "Charts": ChartAnalysis(api),
-    "Forecast": Forecast(),
+    "Forecast": Forecast(api, dashboard.items),
     "Settings": Settings(),
-    "Recommendations": Recommendations(),
+    "Recommendations": Recommendations(api),
     "Orders": OrdersLeaderboard(),
     "Optimizer": PortfolioOptimizer(),
+    "Diagnose": Diagnostics(),
 }
 
-# unten in main.py, nach dem pages-Dict
+config = load_config()
+start_collector(tuple(dict.fromkeys(dashboard.items + config["favorites"])))
+if METRICS_PORT:
+    start_metrics_endpoint(int(METRICS_PORT))
+metrics = Metrics.shared()
+
+# Navigation: nur die aktive Seite wird gerendert
+active = st.sidebar.radio("Seite:", list(pages.keys()), key="active_page")
+page_obj = pages[active]
 
-# Erzeuge Tabs anhand der Keys
-tab_labels = list(pages.keys())
-tabs = st.tabs(tab_labels)
+# Automatische Seitenaktualisierung mit dem Intervall der aktiven Seite
+interval = getattr(page_obj, "REFRESH_INTERVAL", None)
+if interval:
+    st_autorefresh(interval=interval * 1000, limit=None, key=f"datarefresh_{active}")
+    st.sidebar.caption(f"Auto-Refresh alle {interval} s")
+elif getattr(page_obj, "FRAGMENT_REFRESH", None):
+    # Teile der Seite laufen als Fragment mit run_every; ein Seiten-Refresh ist unnötig
+    st.sidebar.caption(f"Auto-Refresh einzelner Bereiche alle {page_obj.FRAGMENT_REFRESH} s")
+else:
+    st.sidebar.caption("Auto-Refresh aus")
+    st.sidebar.button("🔄 Aktualisieren", key="manual_refresh")
 
-# Iteriere synchron über Tabs und die dazugehörigen Page-Objekte
-for tab, page_obj in zip(tabs, pages.values()):
-    with tab:
-        # Falls versehentlich None oder nicht implementiert:
-        if page_obj is None:
-            st.info("Diese Seite ist noch nicht implementiert.")
-        else:
+# Falls versehentlich None oder nicht implementiert:
+if page_obj is None:
+    st.info("Diese Seite ist noch nicht implementiert.")
+else:
+    try:
+        with metrics.rerun(active):
             page_obj.render()
+    finally:
+        # Auch wenn die Seite per st.rerun() abbricht
+        if METRICS_FILE:
+            metrics.write_prometheus(METRICS_FILE)
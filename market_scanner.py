@@ -0,0 +1,144 @@
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from forecast_engine import fit_trend, last_valid
+from history_store import PERIOD_SECONDS, PERIOD_STEP, HistoryStore
+from price_panel import PricePanel
+
+# Quantile der Empfehlungsregel (wie in der Einzelansicht)
+LOW_Q, HIGH_Q = 0.05, 0.95
+ACTIONS = np.array(["Beobachten", "Kaufen", "Verkaufen"])
+
+
+def nanquantile_columns(data: np.ndarray, qs) -> np.ndarray:
+    """Wie ``np.nanquantile(data, qs, axis=0)`` (linear), aber ohne Schleife über die Spalten."""
+    ordered = np.sort(data, axis=0)                  # NaN landen am Ende
+    n = (~np.isnan(data)).sum(axis=0)
+    pos = np.asarray(qs, dtype=np.float64)[:, None] * np.maximum(n - 1, 0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+    cols = np.arange(data.shape[1])
+    frac = pos - lo
+    out = ordered[lo, cols] * (1 - frac) + ordered[hi, cols] * frac
+    return np.where(n > 0, out, np.nan)
+
+
+class MarketScanner:
+    """Kauf-/Verkaufs-/Beobachten-Regel über den ganzen Markt in einem Durchgang.
+
+    Liest direkt aus dem ``HistoryStore`` (eine Abfrage für alle Items) und lädt
+    bei jedem Aufruf nur die Items neu, die seit dem letzten Mal synchronisiert
+    wurden. Die Signale entstehen als Quantile und Regressionen über die
+    gestapelte Preismatrix (Zeit × Items).
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, store: HistoryStore = None):
+        self.store = store or HistoryStore.shared()
+        self._state = {}    # (period, field) -> dict(synced, item, ts, value, result)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "MarketScanner":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def refresh(self, period: str = "day", field: str = "sell") -> bool:
+        """Neue Ticks übernehmen; True, wenn sich etwas geändert hat."""
+        with self._lock:
+            state = self._state.setdefault((period, field), {
+                'synced': -np.inf,
+                'names': pd.Index([], dtype=object),
+                'code': np.empty(0, dtype=np.int64),
+                'ts': np.empty(0),
+                'value': np.empty(0),
+                'result': None,
+            })
+            rows, newest = self.store.changed_since(period, state['synced'], field)
+            if not rows:
+                return False
+            new = pd.DataFrame(rows, columns=['item', 'ts', 'value'])
+            # Items als ganzzahlige Codes führen; neue Namen hinten anhängen
+            names = state['names'].append(pd.Index(new['item'].unique()).difference(state['names']))
+            code = names.get_indexer(new['item'])
+            # Geänderte Items komplett ersetzen, alle anderen bleiben stehen
+            keep = ~np.isin(state['code'], np.unique(code))
+            code = np.concatenate([state['code'][keep], code])
+            ts = np.concatenate([state['ts'][keep], new['ts'].to_numpy(np.float64)])
+            value = np.concatenate([state['value'][keep], new['value'].to_numpy(np.float64)])
+            inside = ts >= ts.max() - PERIOD_SECONDS[period]
+            order = np.lexsort((ts[inside], code[inside]))
+            state.update(
+                synced=newest,
+                names=names,
+                code=code[inside][order],
+                ts=ts[inside][order],
+                value=value[inside][order],
+                result=None,
+            )
+            return True
+
+    def matrix(self, period: str = "day", field: str = "sell"):
+        """(Items, Raster in Unix-Sekunden, Preise Zeit × Items) aus dem aktuellen Stand."""
+        state = self._state.get((period, field))
+        if state is None or not len(state['ts']):
+            return np.empty(0, dtype=object), np.empty(0), np.empty((0, 0))
+        step = PERIOD_STEP[period]
+        codes = state['code']
+        cells = (state['ts'] // step).astype(np.int64) * step
+        end = cells.max()
+        start = end - PERIOD_SECONDS[period] // step * step
+        grid = np.arange(start, end + step, step)
+        # Letzter Tick je (Item, Rasterzelle); Zeilen sind nach Item und Zeit sortiert
+        slot = codes * len(grid) + (cells - start) // step
+        last = np.r_[slot[1:] != slot[:-1], True] & (cells >= start)
+        data = np.full((len(grid), len(state['names'])), np.nan)
+        data[(cells[last] - start) // step, codes[last]] = state['value'][last]
+        data = pd.DataFrame(data).ffill(limit=PricePanel.FFILL_LIMIT).to_numpy()
+        return state['names'].to_numpy(), grid, data
+
+    def scan(self, period: str = "day", field: str = "sell", top: int = 50) -> pd.DataFrame:
+        """Rangliste der deutlichsten Signale (Kaufen/Verkaufen vor Beobachten)."""
+        self.refresh(period, field)
+        state = self._state.get((period, field))
+        if state is None:
+            return pd.DataFrame()
+        if state['result'] is None:
+            state['result'] = self._evaluate(*self.matrix(period, field))
+        return state['result'].head(top)
+
+    @staticmethod
+    def _evaluate(items, grid, data) -> pd.DataFrame:
+        if not len(items):
+            return pd.DataFrame()
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            # Items ganz ohne Werte im Fenster liefern hier nur NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, high = nanquantile_columns(data, [LOW_Q, HIGH_Q])
+            avg = np.nanmean(data, axis=0)
+            latest = last_valid(data)
+            slope, _ = fit_trend((grid - grid[-1]) / 3600.0, data)
+            action = np.where(latest <= low, 1, np.where(latest >= high, 2, 0))
+            # Abstand jenseits der Quantilgrenze relativ zum Kurs
+            strength = np.where(action == 1, (low - latest) / latest,
+                                np.where(action == 2, (latest - high) / latest, 0.0))
+            table = pd.DataFrame({
+                'Empfehlung': ACTIONS[action],
+                'Aktuell': latest,
+                'Q5': low,
+                'Q95': high,
+                'Durchschnitt': avg,
+                'Trend %/h': slope / latest * 100,
+                'Stärke %': strength * 100,
+                '_rang': (action > 0).astype(int),
+            }, index=pd.Index(items, name='Item'))
+        table = table[np.isfinite(latest)]
+        return table.sort_values(['_rang', 'Stärke %', 'Trend %/h'], ascending=False) \
+            .drop(columns='_rang')
@@ -0,0 +1,132 @@
+import threading
+
+import numpy as np
+
+
+def ledoit_wolf(returns: np.ndarray):
+    """Geschrumpfte Kovarianz (Ledoit-Wolf, Ziel = skalierte Einheitsmatrix).
+
+    Stabilisiert die Schätzung, wenn es kaum mehr Beobachtungen als Items gibt.
+    Gibt (Kovarianz, Schrumpfungsintensität) zurück.
+    """
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    s = x.T @ x / t
+    m = np.trace(s) / n
+    d2 = ((s - m * np.eye(n)) ** 2).sum()
+    if d2 <= 0:
+        return s, 0.0
+    # Σ_t ||x_t x_tᵀ - S||² = Σ_t ||x_t||⁴ - T·||S||²
+    b2_bar = (((x ** 2).sum(axis=1) ** 2).sum() - t * (s ** 2).sum()) / t ** 2
+    delta = min(max(b2_bar, 0.0), d2) / d2
+    return delta * m * np.eye(n) + (1 - delta) * s, delta
+
+
+def project_simplex(v: np.ndarray) -> np.ndarray:
+    """Zeilenweise euklidische Projektion auf {w >= 0, sum w = 1} (vektorisiert)."""
+    n = v.shape[1]
+    u = -np.sort(-v, axis=1)
+    css = np.cumsum(u, axis=1) - 1
+    k = np.arange(1, n + 1)
+    rho = (u - css / k > 0).sum(axis=1)
+    theta = css[np.arange(len(v)), rho - 1] / rho
+    return np.maximum(v - theta[:, None], 0)
+
+
+class MeanVarianceEngine:
+    """Long-only Mean-Variance-Optimierung für viele λ gleichzeitig.
+
+    Ziel je Zeile i: min λ_i·wᵀΣw − (1−λ_i)·μᵀw mit w ≥ 0, Σw = 1.
+    Gelöst mit beschleunigtem projiziertem Gradienten (FISTA) und analytischem
+    Gradienten; alle λ laufen als eine Matrix-Iteration. Schätzungen und die
+    letzte Front werden je Daten-Schlüssel gecacht und dienen als Warmstart.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._estimates = {}     # key -> (mu, cov, shrinkage)
+        self._fronts = {}        # key -> (lams, W)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "MeanVarianceEngine":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def estimate(self, key, returns: np.ndarray):
+        with self._lock:
+            hit = self._estimates.get(key)
+        if hit is not None:
+            return hit
+        mu = returns.mean(axis=0)
+        cov, shrink = ledoit_wolf(returns)
+        with self._lock:
+            if len(self._estimates) >= self.max_entries:
+                self._estimates.pop(next(iter(self._estimates)))
+            self._estimates[key] = (mu, cov, shrink)
+        return mu, cov, shrink
+
+    @staticmethod
+    def solve(mu: np.ndarray, cov: np.ndarray, lams, w0: np.ndarray = None,
+              tol: float = 1e-9, max_iter: int = 5000) -> np.ndarray:
+        lams = np.atleast_1d(np.asarray(lams, dtype=np.float64))
+        n = len(mu)
+        w = np.full((len(lams), n), 1.0 / n) if w0 is None else project_simplex(np.atleast_2d(w0))
+        # Schrittweite 1/L mit L = 2λ·||Σ||₂ (Lipschitz-Konstante des Gradienten)
+        lip = 2 * lams * np.linalg.eigvalsh(cov)[-1]
+        step = 1.0 / np.maximum(lip, 1e-12)
+        y, t = w, np.ones(len(lams))
+        for _ in range(max_iter):
+            grad = 2 * lams[:, None] * (y @ cov) - (1 - lams)[:, None] * mu
+            w_new = project_simplex(y - step[:, None] * grad)
+            delta = w_new - w
+            if np.abs(delta).max() < tol:
+                w = w_new
+                break
+            # Adaptiver Neustart je Zeile, sobald das Momentum bergauf zeigt
+            t[((y - w_new) * delta).sum(axis=1) > 0] = 1.0
+            t_new = (1 + np.sqrt(1 + 4 * t * t)) / 2
+            y = w_new + ((t - 1) / t_new)[:, None] * delta
+            w, t = w_new, t_new
+        return w
+
+    def frontier(self, key, mu: np.ndarray, cov: np.ndarray, lams) -> np.ndarray:
+        """Gewichte für alle λ des Rasters in einem Durchgang (Zeile je λ)."""
+        lams = np.asarray(lams, dtype=np.float64)
+        with self._lock:
+            front = self._fronts.get(key)
+        if front is not None and np.array_equal(front[0], lams):
+            return front[1]
+        w = self.solve(mu, cov, lams, w0=self._warm_start(key, lams, len(mu)))
+        with self._lock:
+            if len(self._fronts) >= self.max_entries:
+                self._fronts.pop(next(iter(self._fronts)))
+            self._fronts[key] = (lams, w)
+        return w
+
+    def optimize(self, key, mu: np.ndarray, cov: np.ndarray, lam: float) -> np.ndarray:
+        """Einzelnes λ, warm gestartet von der nächstgelegenen Lösung der Front."""
+        w0 = self._warm_start(key, np.array([lam]), len(mu))
+        return self.solve(mu, cov, [lam], w0=w0)[0]
+
+    def _warm_start(self, key, lams, n):
+        with self._lock:
+            front = self._fronts.get(key)
+        if front is None or front[1].shape[1] != n:
+            return None
+        known, w = front
+        nearest = np.abs(known[None, :] - lams[:, None]).argmin(axis=1)
+        return w[nearest]
+
+    @staticmethod
+    def stats(mu: np.ndarray, cov: np.ndarray, w: np.ndarray):
+        """Erwartete Rendite und Volatilität je Gewichtszeile."""
+        w = np.atleast_2d(w)
+        ret = w @ mu
+        vol = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', w, cov, w), 0))
+        return ret, vol
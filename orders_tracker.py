@@ -1,12 +1,11 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-from bazaar_api import BazaarAPI
-from time_parser import TimeParser
+from leaderboard import LeaderboardEngine
 
 class OrdersLeaderboard:
+    REFRESH_INTERVAL = 60
+
     def __init__(self):
-        self.api = BazaarAPI()
+        self.engine = LeaderboardEngine.shared()
 
     def render(self):
         st.header("🎖️ Spieler Order Leaderboard (Top 5 Volumen letzter 24 h)")
@@ -22,36 +21,13 @@ class OrdersLeaderboard:
             return
 
         players = [p.strip() for p in raw.split(",") if p.strip()]
-        cutoff = datetime.now() - timedelta(hours=24)
-
-        volumes = []
-        for player in players:
-            orders = self.api.get_player_orders(player)
-            st.write(f"DEBUG – Rohdaten für {player}:", orders)
-
-            total_vol = 0.0
-            for order in orders:
-                raw_ts = (
-                    order.get("timestamp")
-                    or order.get("time")
-                    or order.get("createdTimestamp", "")
-                )
-                try:
-                    ts = TimeParser.parse(raw_ts)
-                except:
-                    continue
-                if ts >= cutoff:
-                    qty = order.get("quantity", 0)
-                    price = order.get("price", order.get("unit_price", 0))
-                    total_vol += qty * price
-
-            volumes.append({"player": player, "volume": total_vol})
+        # Parallel laden, nur neue Orders parsen, Fenster-Summe vektorisiert
+        ranking = self.engine.volumes(players)
+        top = ranking[ranking['Volumen'] > 0].head(5)
 
-        if volumes:
-            df = pd.DataFrame(volumes).sort_values("volume", ascending=False).head(5)
-            df.index = df["player"]
+        if not top.empty:
             st.subheader("Top 5 Händler nach Volumen (letzte 24 h)")
-            st.bar_chart(df["volume"])
-            st.dataframe(df.rename(columns={"volume": "Volumen"}))
+            st.bar_chart(top["Volumen"])
+            st.dataframe(top)
         else:
             st.info("Keine Volumen-Daten in den letzten 24 h gefunden.")
@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 from datetime import datetime
 from bazaar_api import BazaarAPI
+import io
+import ledger_db
+import ledger_io
 
 # --- Hilfsfunktion für deutsches Zahlenformat ---
 def fmt_de(x, decimals=1):
@@ -14,78 +16,89 @@ def fmt_de(x, decimals=1):
 DB_PATH = 'portfolio.db'
 @st.cache_resource
 def init_db():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    c = conn.cursor()
-    # Portfolio-Tabelle
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS portfolio (
-            id INTEGER PRIMARY KEY,
-            item TEXT,
-            quantity REAL,
-            buy_price REAL,
-            timestamp TEXT
-        )
-    ''')
-    # Sales-Tabelle
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS sales (
-            id INTEGER PRIMARY KEY,
-            item TEXT,
-            quantity REAL,
-            sale_price REAL,
-            sale_value REAL,
-            timestamp TEXT
-        )
-    ''')
-    conn.commit()
-    return conn
+    # WAL-Modus, Indizes und Schema-Migrationen: siehe ledger_db.py
+    return ledger_db.connect(DB_PATH)
 
 class Portfolio:
+    REFRESH_INTERVAL = 60
+
     def __init__(self):
         self.conn = init_db()
         self.api = BazaarAPI()
 
     def add_transaction(self, item: str, qty: float, price: float):
         ts = datetime.utcnow().isoformat()
-        self.conn.execute(
-            'INSERT INTO portfolio (item, quantity, buy_price, timestamp) VALUES (?,?,?,?)',
-            (item, qty, price, ts)
-        )
-        self.conn.commit()
+        ledger_db.record_buy(self.conn, item, qty, price, ts)
 
     def delete_transaction(self, txn_id: int):
-        self.conn.execute('DELETE FROM portfolio WHERE id = ?', (txn_id,))
-        self.conn.commit()
+        self.delete_transactions([txn_id])
+
+    def delete_transactions(self, txn_ids) -> int:
+        """Löscht Kauf-Lots; ``ValueError``, wenn schon gegen sie verkauft wurde."""
+        return ledger_db.delete_lots(self.conn, txn_ids)
 
     def get_transactions(self) -> pd.DataFrame:
         return pd.read_sql('SELECT * FROM portfolio', self.conn)
 
+    def get_open_lots(self) -> pd.DataFrame:
+        return pd.read_sql('SELECT * FROM portfolio WHERE remaining > 0', self.conn)
+
+    def get_positions(self) -> pd.DataFrame:
+        """Materialisierte Positionen je Item (Bestand, Kostenbasis, realisierter PnL)."""
+        return pd.read_sql('SELECT * FROM positions', self.conn)
+
     def add_sale(self, item: str, qty: float, price: float):
         ts = datetime.utcnow().isoformat()
-        sale_value = qty * price
-        self.conn.execute(
-            'INSERT INTO sales (item, quantity, sale_price, sale_value, timestamp) VALUES (?,?,?,?,?)',
-            (item, qty, price, sale_value, ts)
-        )
-        self.conn.commit()
+        return ledger_db.record_sale(self.conn, item, qty, price, ts)
 
     def delete_sale(self, sale_id: int):
-        self.conn.execute('DELETE FROM sales WHERE id = ?', (sale_id,))
-        self.conn.commit()
+        self.delete_sales([sale_id])
 
-    def get_sales_for_today(self) -> pd.DataFrame:
-        today = datetime.utcnow().date().isoformat()
+    def delete_sales(self, sale_ids) -> int:
+        return ledger_db.delete_sales(self.conn, sale_ids)
+
+    def get_sales_between(self, start: str, end: str) -> pd.DataFrame:
+        """Verkäufe mit start <= timestamp < end (ISO-Strings, nutzt den Index)."""
         return pd.read_sql(
             """
-            SELECT id, item, quantity, sale_price, sale_value, timestamp
+            SELECT id, item, quantity, sale_price, sale_value, cost_basis, timestamp
             FROM sales
-            WHERE date(timestamp)=?
+            WHERE timestamp >= ? AND timestamp < ?
             """,
             self.conn,
-            params=(today,),
+            params=(start, end),
             parse_dates=['timestamp']
         )
 
+    def get_sales_for_today(self) -> pd.DataFrame:
+        return self.get_sales_between(*ledger_db.day_range(datetime.utcnow().date()))
+
+    def market_prices(self, items) -> pd.Series:
+        quotes = self.api.get_latest_quotes(items)
+        return pd.Series({it: q['buy'] for it, q in quotes.items()}, name='market_price', dtype=float)
+
+    def value_positions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Bewertet alle Lots mit einem Kurs pro Item (ein Batch statt ein Call pro Zeile)."""
+        df = df.join(self.market_prices(df['item'].unique()), on='item')
+        df['net_sale_price'] = df['market_price'] * (1 - 0.01125)
+        df['PnL_raw'] = df['remaining'] * (df['market_price'] - df['buy_price'])
+        df['PnL_tax'] = df['remaining'] * (df['net_sale_price'] - df['buy_price'])
+        return df
+
+    def summarize(self) -> dict:
+        """Kennzahlen aus der kleinen Positions-Tabelle statt aus dem ganzen Ledger."""
+        pos = self.get_positions()
+        if pos.empty:
+            return {'brutto': 0.0, 'netto': 0.0, 'realized': 0.0}
+        held = pos[pos['quantity'] > ledger_db.EPS]
+        market = held['item'].map(self.market_prices(held['item'].tolist()))
+        value = held['quantity'] * market
+        return {
+            'brutto': (value - held['cost']).sum(),
+            'netto': (value * (1 - 0.01125) - held['cost']).sum(),
+            'realized': pos['realized_pnl'].sum(),
+        }
+
     def render(self):
         st.header("📁 Portfolio & PnL-Tracking")
 
@@ -113,17 +126,15 @@ class Portfolio:
 
         # --- Aktuelle Positionen ---
         st.subheader("Aktuelle Positionen")
-        df = self.get_transactions()
+        df = self.get_open_lots()
         if df.empty:
             st.info("Keine Transaktionen vorhanden.")
         else:
-            df['market_price'] = df['item'].apply(lambda it: self.api.get_history(it)[-1]['buy'])
-            df['net_sale_price'] = df['market_price'] * (1 - 0.01125)
-            df['PnL_raw'] = df['quantity'] * (df['market_price'] - df['buy_price'])
-            df['PnL_tax'] = df['quantity'] * (df['net_sale_price'] - df['buy_price'])
+            df = self.value_positions(df)
 
             disp = df.rename(columns={
-                'quantity':         'Menge',
+                'quantity':         'Kaufmenge',
+                'remaining':        'Menge',
                 'buy_price':        'Kaufpreis',
                 'market_price':     'Marktpreis',
                 'net_sale_price':   'Verkaufspreis nach Tax',
@@ -133,6 +144,7 @@ class Portfolio:
 
             # alle numerischen Spalten formatieren
             for col, dec in [
+                ('Kaufmenge', 2),
                 ('Menge', 2),
                 ('Kaufpreis', 1),
                 ('Marktpreis', 1),
@@ -151,39 +163,49 @@ class Portfolio:
                 format_func=lambda x: f"ID {x} – {disp.loc[x,'item']} ×{disp.loc[x,'Menge']}"
             , key="del_purchases")
             if st.button("Ausgewählte Käufe löschen", key="btn_del_pur"):
-                for txn_id in to_del:
-                    self.delete_transaction(txn_id)
-                st.success(f"{len(to_del)} Eintrag(e) gelöscht")
-                from streamlit_autorefresh import st_autorefresh
-                st_autorefresh(interval=500, limit=1, key="reload_pur")
+                try:
+                    self.delete_transactions(to_del)
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    st.success(f"{len(to_del)} Eintrag(e) gelöscht")
+                    from streamlit_autorefresh import st_autorefresh
+                    st_autorefresh(interval=500, limit=1, key="reload_pur")
 
-            total_brutto = df['PnL_raw'].sum()
-            total_netto  = df['PnL_tax'].sum()
-            c1, c2 = st.columns(2)
-            c1.metric("Gesamt-PnL (brutto)", fmt_de(total_brutto,1) + " Coins")
-            c2.metric("Gesamt-PnL (netto)",  fmt_de(total_netto,1) + " Coins")
+            summary = self.summarize()
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Gesamt-PnL (brutto)", fmt_de(summary['brutto'],1) + " Coins")
+            c2.metric("Gesamt-PnL (netto)",  fmt_de(summary['netto'],1) + " Coins")
+            c3.metric("Realisiert (netto)",  fmt_de(summary['realized'],1) + " Coins")
 
-        # --- Verkauf erfassen ---
+        # --- Verkauf erfassen (FIFO über alle offenen Lots des Items) ---
         st.subheader("Verkauf erfassen")
-        df_tx = self.get_transactions()
-        if df_tx.empty:
+        pos = self.get_positions()
+        pos = pos[pos['quantity'] > ledger_db.EPS].set_index('item')
+        if pos.empty:
             st.info("Keine Positionen zum Verkaufen vorhanden.")
         else:
-            txn_map = df_tx.set_index('id').apply(
-                lambda row: f"ID {row.name}: {row['item']} ×{fmt_de(row['quantity'],2)}", axis=1
-            ).to_dict()
-            sel_id = st.selectbox(
-                "Verkaufs-Transaktion auswählen:",
-                options=list(txn_map.keys()),
-                format_func=lambda x: txn_map[x],
-                key="sale_txn"
+            sel_item = st.selectbox(
+                "Position auswählen:",
+                options=pos.index.tolist(),
+                format_func=lambda it: f"{it} ×{fmt_de(pos.loc[it, 'quantity'], 2)}",
+                key="sale_item"
             )
-            tx = df_tx.loc[df_tx['id'] == sel_id].iloc[0]
-            default_price = self.api.get_history(tx['item'])[-1]['buy']
-            if st.session_state.get("last_sale_txn") != sel_id:
+            held = float(pos.loc[sel_item, 'quantity'])
+            default_price = self.api.get_latest_quote(sel_item)['buy']
+            if st.session_state.get("last_sale_item") != sel_item:
                 st.session_state["sale_price"] = default_price
-                st.session_state["last_sale_txn"] = sel_id
+                st.session_state["last_sale_item"] = sel_item
 
+            s_qty = st.number_input(
+                "Verkaufsmenge:",
+                min_value=0.0,
+                max_value=held,
+                value=held,
+                step=0.1,
+                format="%.2f",
+                key=f"sale_qty_{sel_item}"
+            )
             s_price = st.number_input(
                 "Verkaufspreis pro Einheit:",
                 min_value=0.0,
@@ -194,11 +216,14 @@ class Portfolio:
             )
             if st.button("Verkaufen", key="sale_btn"):
                 final_price = st.session_state["sale_price_input"]
-                self.add_sale(tx['item'], tx['quantity'], final_price)
-                self.delete_transaction(sel_id)
-                st.success(f"ID {sel_id} verkauft: {fmt_de(tx['quantity'],2)}× {tx['item']} @ {fmt_de(final_price,2)}")
-                from streamlit_autorefresh import st_autorefresh
-                st_autorefresh(interval=500, limit=1, key="reload_sale")
+                try:
+                    self.add_sale(sel_item, s_qty, final_price)
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    st.success(f"Verkauft: {fmt_de(s_qty,2)}× {sel_item} @ {fmt_de(final_price,2)}")
+                    from streamlit_autorefresh import st_autorefresh
+                    st_autorefresh(interval=500, limit=1, key="reload_sale")
 
         # --- Tages-Verkäufe anzeigen ---
         today = datetime.utcnow().date().isoformat()
@@ -207,10 +232,12 @@ class Portfolio:
         if df_sales.empty:
             st.info("Heute keine Verkäufe.")
         else:
-            df_sales['margin_per_unit'] = df_sales['sale_price'] - (df_sales['sale_value'] / df_sales['quantity'])
-            df_sales['profit_net']      = df_sales['sale_value'] * 0.98875 - df_sales['sale_value']
+            # Kostenbasis aus der FIFO-Zuordnung; Altbestand ohne Zuordnung wie bisher
+            cost = df_sales['cost_basis'].fillna(df_sales['sale_value'])
+            df_sales['margin_per_unit'] = df_sales['sale_price'] - (cost / df_sales['quantity'])
+            df_sales['profit_net']      = df_sales['sale_value'] * 0.98875 - cost
 
-            df_disp = df_sales.rename(columns={
+            df_disp = df_sales.drop(columns='cost_basis').rename(columns={
                 'item':              'Artikel',
                 'quantity':          'Menge',
                 'sale_price':        'Preis/Einh.',
@@ -242,8 +269,31 @@ class Portfolio:
                 format_func=lambda x: f"ID {x} – {df_disp.loc[x,'Artikel']}"
             , key="del_sales_today")
             if st.button("Ausgewählte Verkäufe löschen", key="btn_del_sales"):
-                for sale_id in to_del_sales:
-                    self.delete_sale(sale_id)
+                self.delete_sales(to_del_sales)
                 st.success(f"{len(to_del_sales)} Verkaufs-Eintrag(e) gelöscht")
                 from streamlit_autorefresh import st_autorefresh
                 st_autorefresh(interval=500, limit=1, key="reload_sales")
+
+        # --- Bulk-Import / Export ---
+        with st.expander("📦 Import / Export (CSV, Parquet)"):
+            table = st.radio("Tabelle:", ["portfolio", "sales"], horizontal=True, key="io_table")
+            upload = st.file_uploader("Datei importieren:", type=["csv", "parquet"], key="io_upload")
+            if upload is not None and st.button("Importieren", key="io_import"):
+                fmt = "parquet" if upload.name.endswith(".parquet") else "csv"
+                try:
+                    n = ledger_io.import_ledger(self.conn, table, upload, fmt)
+                except (ValueError, ImportError) as e:
+                    st.error(f"Import fehlgeschlagen: {e}")
+                else:
+                    st.success(f"{n} Zeilen in '{table}' importiert")
+
+            fmt = st.radio("Export-Format:", ["csv", "parquet"], horizontal=True, key="io_fmt")
+            if st.button("Export vorbereiten", key="io_export"):
+                buf = io.BytesIO()
+                try:
+                    ledger_io.export_ledger(self.conn, table, buf, fmt)
+                except ImportError as e:
+                    st.error(f"Export fehlgeschlagen: {e}")
+                else:
+                    st.download_button("Herunterladen", buf.getvalue(),
+                                       file_name=f"{table}.{fmt}", key="io_download")
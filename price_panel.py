@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from bazaar_api import BazaarAPI
+from history_frame import HistoryFrame
+from history_store import PERIOD_SECONDS, PERIOD_STEP
+from time_parser import TimeParser
+
+
+def to_grid(frame: HistoryFrame, period: str, field: str = "sell", ffill_limit: int = None):
+    """Einzelnes Item lückenlos auf das Raster der Periode bringen: (Raster, Werte)."""
+    _, cells, values = PricePanel._align(frame, period, field)
+    if not len(cells):
+        return cells, values
+    step = PERIOD_STEP[period]
+    grid = np.arange(cells[0], cells[-1] + step, step)
+    out = np.full(len(grid), np.nan)
+    out[(cells - cells[0]) // step] = values
+    limit = PricePanel.FFILL_LIMIT if ffill_limit is None else ffill_limit
+    return grid, pd.Series(out).ffill(limit=limit).to_numpy()
+
+
+class PricePanel:
+    """Preise vieler Items auf einem gemeinsamen Zeitraster (Zeilen = Raster, Spalten = Items).
+
+    Jede Item-Spalte wird einmal auf das Raster der Periode gebracht und mit
+    ``HistoryFrame.version`` gecacht; bei neuen Ticks wird nur diese Spalte neu
+    gebaut. Ein Panel enthält genau die angefragten Items; Renditen und
+    Kovarianz werden pro Item-Menge und Stand einmal berechnet.
+    """
+
+    # Maximal so viele Rasterschritte über Lücken hinweg vorwärts füllen
+    FFILL_LIMIT = 6
+    # Zuletzt genutzte Item-Mengen, deren Panels im Speicher bleiben
+    MAX_PANELS = 16
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, api: BazaarAPI = None):
+        self.api = api or BazaarAPI()
+        self._columns = {}   # (period, field, item) -> (version, grid-Sekunden, Werte)
+        self._panels = OrderedDict()    # (period, field, items) -> dict(state, prices, returns, cov)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "PricePanel":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def prices(self, items, period: str = "day", field: str = "sell") -> pd.DataFrame:
+        """Ausgerichtete Preise der ``items`` (lokale Zeit als Index)."""
+        return self._panel(items, period, field)['prices'][list(items)]
+
+    def returns(self, items, period: str = "day", field: str = "sell") -> pd.DataFrame:
+        """Einfache Renditen; nur Zeilen, in denen alle ``items`` Werte haben."""
+        return self._panel(items, period, field)['returns'][list(items)].dropna()
+
+    def cov(self, items, period: str = "day", field: str = "sell") -> pd.DataFrame:
+        """Paarweise Kovarianz der Renditen (Ausschnitt aus der Gesamtmatrix)."""
+        items = list(items)
+        return self._panel(items, period, field)['cov'].loc[items, items]
+
+    def matrix(self, items, period: str = "day", field: str = "sell"):
+        """Gestapelte Rohdaten: (Raster in Unix-Sekunden, Werte-Matrix Zeit × Items)."""
+        panel = self._panel(items, period, field)
+        return panel['grid'], panel['prices'][list(items)].to_numpy()
+
+    def version(self, items, period: str = "day", field: str = "sell") -> tuple:
+        """Stand der ``items``; ändert sich nur, wenn eine ihrer Spalten neue Ticks bekam."""
+        return self._panel(items, period, field)['state']
+
+    # --- intern ---
+    def _panel(self, items, period, field):
+        frames = self.api.get_history_many(list(items), period)
+        members = sorted(frames)
+        key = (period, field, tuple(members))
+        with self._lock:
+            for item in members:
+                if self._stale(period, field, item, frames[item]):
+                    self._columns[(period, field, item)] = self._align(frames[item], period, field)
+            state = tuple(self._columns[(period, field, i)][0] for i in members)
+            panel = self._panels.get(key)
+            if panel is None or panel['state'] != state:
+                panel = self._panels[key] = self._build(period, field, members)
+            self._panels.move_to_end(key)
+            while len(self._panels) > self.MAX_PANELS:
+                self._panels.popitem(last=False)
+            return panel
+
+    def _stale(self, period, field, item, frame: HistoryFrame) -> bool:
+        col = self._columns.get((period, field, item))
+        return col is None or col[0] != frame.version
+
+    @staticmethod
+    def _align(frame: HistoryFrame, period: str, field: str):
+        """Letzter Wert je Rasterzelle (vektorisiert, ts ist aufsteigend sortiert)."""
+        step = PERIOD_STEP[period]
+        values = getattr(frame, field)
+        if not len(frame):
+            return frame.version, np.empty(0, dtype=np.int64), np.empty(0)
+        cells = (frame.ts // step).astype(np.int64)
+        last = np.r_[cells[1:] != cells[:-1], True]
+        return frame.version, cells[last] * step, values[last]
+
+    def _build(self, period, field, members):
+        step = PERIOD_STEP[period]
+        cols = {i: self._columns[(period, field, i)] for i in members}
+        ends = [c[1][-1] for c in cols.values() if len(c[1])]
+        end = max(ends) if ends else 0
+        start = end - PERIOD_SECONDS[period] // step * step
+        grid = np.arange(start, end + step, step) if ends else np.empty(0, dtype=np.int64)
+        data = np.full((len(grid), len(members)), np.nan)
+        for j, item in enumerate(members):
+            _, cells, values = cols[item]
+            inside = cells >= start
+            # Zellen sind Vielfache von step, der Rasterindex ergibt sich direkt
+            data[(cells[inside] - start) // step, j] = values[inside]
+        prices = pd.DataFrame(data, index=TimeParser.from_epoch_many(grid), columns=members)
+        prices = prices.ffill(limit=self.FFILL_LIMIT)
+        returns = prices.pct_change(fill_method=None)
+        return {
+            'items': members,
+            'grid': grid,
+            'state': tuple(cols[i][0] for i in members),
+            'prices': prices,
+            'returns': returns,
+            'cov': returns.cov(),
+        }
@@ -1,34 +1,74 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime
+import requests
 from bazaar_api import BazaarAPI
+from market_scanner import MarketScanner
 from time_parser import TimeParser
 
 class Recommendations:
+    REFRESH_INTERVAL = 120
+    # Auswahl im Einzel-Modus; zugleich Fallback, falls der Produktkatalog nicht erreichbar ist
+    DEFAULT_ITEMS = ["BOOSTER_COOKIE", "RECOMBOBULATOR_3000"]
+
+    def __init__(self, api: BazaarAPI):
+        self.api = api
+        self.scanner = MarketScanner.shared()
+
+    def _catalogue(self) -> list:
+        try:
+            return self.api.get_items() or self.DEFAULT_ITEMS
+        except requests.RequestException:
+            return self.DEFAULT_ITEMS
+
     def render(self):
         st.header("💡 Automatisierte Empfehlungen")
-        # Auswahl des Items
-        item = st.selectbox(
-            "Item:",
-            ["BOOSTER_COOKIE", "RECOMBOBULATOR_3000"],
-            key="rec_item"
-        )
+        mode = st.radio("Modus:", ["Einzelnes Item", "Marktscanner"],
+                        horizontal=True, key="rec_mode")
         # Auswahl des Zeitraums
         period = st.selectbox(
             "Zeitraum:",
             ["hour", "day", "week"],
             key="rec_period"
         )
+        if mode == "Marktscanner":
+            self._render_scanner(period)
+        else:
+            self._render_item(period)
+
+    def _render_scanner(self, period: str):
+        catalogue = self._catalogue()
+        collector = BazaarAPI.collector
+        if collector is not None and collector.is_alive():
+            if st.button(f"Alle {len(catalogue)} Katalog-Items verfolgen", key="rec_track_all"):
+                # Collector füllt den lokalen Speicher, der Scanner liest nur daraus
+                collector.track(catalogue, period)
+        else:
+            st.caption("Collector läuft nicht – es werden nur bereits gespeicherte Ticks ausgewertet.")
+
+        top = st.slider("Anzahl Treffer:", 10, 200, 50, key="rec_top")
+        table = self.scanner.scan(period, top=top)
+        if table.empty:
+            st.info("Noch keine gespeicherten Ticks für diesen Zeitraum.")
+            return
+        st.dataframe(table.round(2), use_container_width=True)
+
+    def _render_item(self, period: str):
+        # Auswahl des Items
+        item = st.selectbox(
+            "Item:",
+            self.DEFAULT_ITEMS,
+            key="rec_item"
+        )
         # Historische Daten abrufen
-        data = BazaarAPI().get_history(item, period)
+        data = self.api.get_history(item, period)
         if not data:
             st.error("⚠️ Keine Daten verfügbar.")
             return
 
         # Preise und Zeit indexieren
-        times = [TimeParser.parse(d['timestamp']) for d in data]
-        prices = pd.Series([d['sell'] for d in data], index=times)
+        times = data.time
+        prices = pd.Series(data.sell, index=times, copy=False)
         latest = prices.iloc[-1]
         low    = prices.quantile(0.05)
         high   = prices.quantile(0.95)
@@ -48,11 +88,11 @@ class Recommendations:
                 f"\nDurchschnittlicher Preis (Referenz): {avg:,.1f} Coins"
             )
             # Abschätzung des nächsten Verkaufszeitpunkts
-            ts_nums = np.array([dt.timestamp() for dt in times])
+            ts_nums = data.ts
             slope, intercept = np.polyfit(ts_nums, prices.values, 1)
             if slope > 0:
                 t_target = (high - intercept) / slope
-                dt_target = datetime.fromtimestamp(t_target)
+                dt_target = TimeParser.from_epoch_many([t_target])[0]
                 detail += f"\nErwarteter Verkaufszeitpunkt: {dt_target.strftime('%Y-%m-%d %H:%M:%S')}"
             else:
                 detail += "\nKein steigender Trend – weiter beobachten empfohlen."
@@ -1,12 +1,55 @@
+import uuid
+
 import streamlit as st
+from alerts import RULE_FIELDS, load_config, save_config
+from bazaar_api import BazaarAPI
 
 class Settings:
+    REFRESH_INTERVAL = None
+
     def render(self):
         st.header("⚙️ Benutzer-Customization & UX")
         theme = st.selectbox("Theme:", ["dark","light"], index=0)
         st.session_state['theme'] = theme
+
+        # Favoriten und Regeln liegen in alerts.json, damit der Alarm-Dienst sie ohne Session liest
+        config = load_config()
         fav = st.multiselect("Favoriten:",
-                             ["BOOSTER_COOKIE","RECOMBOBULATOR_3000"],
-                             default=st.session_state.get('favorites', []))
+                             sorted(set(["BOOSTER_COOKIE","RECOMBOBULATOR_3000"]) | set(config['favorites'])),
+                             default=config['favorites'])
         st.session_state['favorites'] = fav
+        if fav != config['favorites']:
+            config['favorites'] = fav
+            save_config(config)
+        collector = BazaarAPI.collector
+        if fav and collector is not None and collector.is_alive():
+            # Favoriten mitpollen, damit ihre Regeln bei jedem Tick geprüft werden
+            collector.track(fav)
         st.write("Favoriten:", fav)
+
+        st.subheader("🔔 Eigene Alarm-Regeln")
+        if not fav:
+            st.info("Regeln gelten für Favoriten – bitte zuerst Favoriten wählen.")
+        else:
+            with st.form("alert_rule", clear_on_submit=True):
+                cols = st.columns(5)
+                item = cols[0].selectbox("Item", fav)
+                field = cols[1].selectbox("Feld", RULE_FIELDS)
+                op = cols[2].selectbox("Bedingung", [">", "<"])
+                value = cols[3].number_input("Wert", value=0.0)
+                mode = cols[4].radio("Einheit", ["abs", "pct"],
+                                     format_func=lambda m: "Coins" if m == "abs" else "% zum Ø")
+                if st.form_submit_button("Regel hinzufügen"):
+                    config['rules'].append({
+                        'id': uuid.uuid4().hex[:8], 'item': item, 'field': field,
+                        'op': op, 'value': value, 'mode': mode,
+                    })
+                    save_config(config)
+
+        if config['rules']:
+            st.dataframe(config['rules'], use_container_width=True)
+            drop = st.multiselect("Regeln löschen:", [r['id'] for r in config['rules']])
+            if drop and st.button("Löschen"):
+                config['rules'] = [r for r in config['rules'] if r['id'] not in drop]
+                save_config(config)
+                st.rerun()
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+
+from alerts import AlertEngine
+from history_frame import HistoryFrame
+
+
+class _Sink:
+    def __init__(self):
+        self.alerts = []
+
+    def emit(self, alert):
+        self.alerts.append(alert)
+
+
+def _frame(margins):
+    # Marge nach Steuer = buy * 0.98875 - sell; sell = 0 hält die Rechnung einfach
+    buy = np.asarray(margins, dtype=np.float64) / 0.98875
+    n = len(buy)
+    return HistoryFrame(np.arange(n) * 3600.0, buy, np.zeros(n), np.ones(n), np.ones(n))
+
+
+def test_every_new_tick_is_checked(tmp_path):
+    sink = _Sink()
+    engine = AlertEngine(api=object(), sinks=[sink], config_path=str(tmp_path / "alerts.json"))
+    base = [100.0] * 12
+    assert engine.evaluate("A", "hour", _frame(base), now=0) == []
+
+    # Nachholen nach einer Pause: der Sprung steckt im mittleren von drei neuen Ticks
+    fired = engine.evaluate("A", "hour", _frame(base + [101.0, 150.0, 100.0]), now=1)
+    assert [a["level"] for a in fired] == ["surge"]
+    assert fired[0]["value"] == 150.0
+    assert sink.alerts == fired
+
+
+def test_first_contact_does_not_replay_history(tmp_path):
+    engine = AlertEngine(api=object(), sinks=[], config_path=str(tmp_path / "alerts.json"))
+    # Historischer Sprung, danach wieder normal: beim ersten Aufruf nur der letzte Tick zählt
+    assert engine.evaluate("A", "hour", _frame([100.0] * 12 + [150.0] + [100.0] * 12), now=0) == []
+
+
+def _engine_with_rules(tmp_path, rules, sink):
+    path = tmp_path / "alerts.json"
+    path.write_text(json.dumps({"favorites": ["A"], "rules": rules}), encoding="utf-8")
+    return AlertEngine(api=object(), sinks=[sink], config_path=str(path))
+
+
+def _rule(rule_id, field, op, value, mode="abs"):
+    return {"id": rule_id, "item": "A", "field": field, "op": op, "value": value, "mode": mode}
+
+
+def test_rule_on_margin_after_tax_fires(tmp_path):
+    sink = _Sink()
+    engine = _engine_with_rules(tmp_path, [_rule("r1", "margin_after_tax", ">", 120)], sink)
+    base = [100.0] * 12
+    engine.evaluate("A", "hour", _frame(base), now=0)
+    fired = engine.evaluate("A", "hour", _frame(base + [150.0]), now=1)
+    assert sorted(a["rule"] for a in fired) == ["margin", "r1"]
+
+
+def test_two_rules_on_one_field_both_fire(tmp_path):
+    sink = _Sink()
+    rules = [_rule("r1", "buy", ">", 110), _rule("r2", "buy", ">", 120)]
+    engine = _engine_with_rules(tmp_path, rules, sink)
+    base = [100.0] * 12
+    engine.evaluate("A", "hour", _frame(base), now=0)
+    fired = engine.evaluate("A", "hour", _frame(base + [150.0]), now=1)
+    assert sorted(a["rule"] for a in fired) == ["margin", "r1", "r2"]
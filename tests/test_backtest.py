@@ -0,0 +1,43 @@
+import numpy as np
+
+from backtest import evaluate_forecasts, evaluate_signals
+from forecast_engine import ForecastEngine
+
+N, WINDOW, HORIZON = 200, 20, 3
+
+
+def test_linear_series_has_known_errors():
+    # y = 10 + 2t: der Trend trifft exakt, der EWMA hinkt um eine feste Strecke hinterher
+    y = 10 + 2 * np.arange(N, dtype=np.float64)
+    result = evaluate_forecasts(y, WINDOW, HORIZON)
+    origins = N - WINDOW - HORIZON + 1
+    assert (result["Ursprünge"] == origins).all()
+    assert result.loc["Trend", "MAE"] < 1e-9
+
+    r = 1 - ForecastEngine.EWMA_ALPHA
+    lags = np.arange(WINDOW)
+    mean_lag = (lags * r ** lags).sum() / (r ** lags).sum()
+    expected = 2 * (mean_lag + HORIZON)
+    assert np.isclose(result.loc["EWMA", "MAE"], expected)
+    targets = y[WINDOW - 1 + HORIZON:]
+    assert np.isclose(result.loc["EWMA", "MAPE %"], (expected / targets).mean() * 100)
+    # Holt lernt den Trend nach, bleibt aber zwischen beiden
+    assert 0 < result.loc["Holt", "MAE"] < expected
+
+
+def test_constant_series_has_no_error():
+    result = evaluate_forecasts(np.full(N, 5.0), WINDOW, HORIZON)
+    np.testing.assert_allclose(result["MAE"], 0.0, atol=1e-9)
+
+
+def test_too_short_series_has_no_origins():
+    result = evaluate_forecasts(np.arange(WINDOW, dtype=np.float64), WINDOW, HORIZON)
+    assert result.empty or (result["Ursprünge"] == 0).all()
+
+
+def test_rising_series_signals():
+    # Stetig steigend: jedes Fensterende ist ein Hoch, "Verkaufen" liegt immer daneben
+    result = evaluate_signals(np.arange(N, dtype=np.float64), WINDOW, HORIZON)
+    assert result.loc["Verkaufen", "Signale"] == N - WINDOW - HORIZON + 1
+    assert result.loc["Verkaufen", "Trefferquote %"] == 0
+    assert result.loc["Kaufen", "Signale"] == 0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from downsample import lttb, minmax, reduce_many
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    x = np.arange(5000, dtype=np.float64)
+    return x, rng.normal(size=len(x)).cumsum()
+
+
+@pytest.mark.parametrize("n", [4, 5, 50, 333, 4999])
+def test_endpoints_kept_and_size_bounded(series, n):
+    x, y = series
+    for idx in (lttb(x, y, n), minmax(y, n)):
+        assert idx[0] == 0 and idx[-1] == len(x) - 1
+        assert len(idx) <= n
+        assert (np.diff(idx) > 0).all()
+    assert len(lttb(x, y, n)) == n
+
+
+def test_short_series_passes_through(series):
+    x, y = series
+    for n in (len(x), len(x) + 10):
+        np.testing.assert_array_equal(lttb(x, y, n), np.arange(len(x)))
+        np.testing.assert_array_equal(minmax(y, n), np.arange(len(x)))
+        np.testing.assert_array_equal(reduce_many(x, [y, -y], n), np.arange(len(x)))
+
+
+def test_minmax_keeps_extremes(series):
+    x, y = series
+    y = y.copy()
+    y[1234], y[3210] = 1e6, -1e6
+    y[777] = np.nan
+    idx = minmax(y, 40)
+    assert {1234, 3210} <= set(idx)
+    assert 777 not in idx
+
+
+def test_reduce_many_bounded(series):
+    x, y = series
+    idx = reduce_many(x, [y, -y, y ** 2], 300)
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert len(idx) <= 300
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from forecast_engine import ForecastEngine
+
+STEP = 300.0
+
+
+class _Panel:
+    """Feste Matrix (Zeit × Items) anstelle des PricePanel."""
+
+    def __init__(self, grid, y):
+        self.grid, self.y = grid, y
+
+    def version(self, items, period="day", field="sell"):
+        return (len(self.grid),)
+
+    def matrix(self, items, period="day", field="sell"):
+        return self.grid, self.y
+
+
+def _reference(x, series, horizons, engine):
+    """Ein Item für sich: numpy/pandas bzw. schlichte Schleife, nur über vorhandene Werte."""
+    valid = ~np.isnan(series)
+    xs, ys = x[valid], series[valid]
+    if len(ys) > 1:
+        slope, intercept = np.polyfit(xs, ys, 1)
+    else:
+        slope, intercept = 0.0, (ys[0] if len(ys) else np.nan)
+    ewma = pd.Series(series).ewm(alpha=engine.EWMA_ALPHA, adjust=True).mean().iloc[-1]
+    level, trend = np.nan, 0.0
+    for value in ys:
+        if np.isnan(level):
+            level = value
+            continue
+        new = engine.HOLT_ALPHA * value + (1 - engine.HOLT_ALPHA) * (level + trend)
+        trend = engine.HOLT_BETA * (new - level) + (1 - engine.HOLT_BETA) * trend
+        level = new
+    return {
+        "Trend": slope * horizons + intercept,
+        "EWMA": np.full(len(horizons), ewma),
+        "Holt": level + trend * horizons / STEP,
+    }
+
+
+def test_batch_matches_per_item_reference():
+    rng = np.random.default_rng(0)
+    n = 60
+    grid = 1_700_000_000 + STEP * np.arange(n)
+    columns = {
+        "RANDOM": 100 + rng.normal(size=n).cumsum(),
+        "GAPS": np.where(rng.random(n) < 0.3, np.nan, 50 + 0.5 * np.arange(n)),
+        "CONST": np.full(n, 42.0),
+        "SHORT": np.r_[np.full(n - 2, np.nan), 7.0, 9.0],
+        "SINGLE": np.r_[np.full(n - 1, np.nan), 5.0],
+    }
+    items = list(columns)
+    y = np.column_stack([columns[it] for it in items])
+    engine = ForecastEngine(_Panel(grid, y))
+    horizons = np.array([0.0, STEP, 12 * STEP])
+    result = engine.forecast(items, horizons)
+
+    x = grid - grid[-1]
+    for it in items:
+        expected = _reference(x, columns[it], horizons, engine)
+        for model, values in expected.items():
+            np.testing.assert_allclose(result.loc[it, model].to_numpy(), values,
+                                       rtol=1e-7, atol=1e-7, err_msg=f"{it}/{model}")
+
+
+def test_constant_series_forecasts_constant():
+    grid = 1_700_000_000 + STEP * np.arange(30)
+    engine = ForecastEngine(_Panel(grid, np.full((30, 1), 42.0)))
+    result = engine.forecast(["CONST"], [STEP, 24 * STEP])
+    np.testing.assert_allclose(result.to_numpy(), 42.0)
+
+
+def test_empty_series_yields_nan():
+    grid = 1_700_000_000 + STEP * np.arange(10)
+    engine = ForecastEngine(_Panel(grid, np.full((10, 1), np.nan)))
+    assert engine.forecast(["EMPTY"], [STEP]).isna().all().all()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from history_frame import HistoryFrame
+from indicators import EMA, IndicatorEngine, IndicatorState, RollingStats
+
+WINDOW = 10
+# Beide Seiten rechnen online; bei Kursen um 1e6 liegt ihr Rundungsrauschen bei ~1e-6
+ATOL = 1e-5
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    # Hohe Kurse mit kleiner Streuung: empfindlich für Auslöschung
+    return 1e6 + rng.normal(size=3000).cumsum()
+
+
+@pytest.mark.parametrize("resync", [RollingStats.RESYNC_EVERY, 7])
+def test_rolling_stats_match_pandas(values, resync, monkeypatch):
+    monkeypatch.setattr(RollingStats, "RESYNC_EVERY", resync)
+    stats = RollingStats(WINDOW)
+    means, stds = [], []
+    for x in values:
+        stats.push(x)
+        means.append(stats.mean)
+        stds.append(stats.std)
+    rolling = pd.Series(values).rolling(WINDOW)
+    np.testing.assert_allclose(means[WINDOW - 1:], rolling.mean()[WINDOW - 1:], rtol=1e-12)
+    np.testing.assert_allclose(stds[WINDOW - 1:], rolling.std()[WINDOW - 1:], rtol=0, atol=ATOL)
+
+
+def test_ema_matches_pandas(values):
+    ema = EMA(WINDOW)
+    out = [ema.push(x) for x in values]
+    np.testing.assert_allclose(out, pd.Series(values).ewm(span=WINDOW, adjust=False).mean(), rtol=1e-12)
+
+
+def test_state_bands_and_baseline(values):
+    ts = np.arange(len(values), dtype=np.float64)
+    state = IndicatorState(WINDOW, k=2)
+    baselines, pcts = [], []
+    for t, x in zip(ts, values):
+        state.push(t, x)
+        baselines.append(state.baseline)
+        pcts.append(state.pct)
+    _, ma, upper, lower, ema = state.series()
+
+    s = pd.Series(values)
+    ref_ma, ref_sd = s.rolling(WINDOW).mean(), s.rolling(WINDOW).std()
+    np.testing.assert_allclose(ma, ref_ma, rtol=1e-12)
+    np.testing.assert_allclose(upper, ref_ma + 2 * ref_sd, rtol=0, atol=ATOL)
+    np.testing.assert_allclose(lower, ref_ma - 2 * ref_sd, rtol=0, atol=ATOL)
+    np.testing.assert_allclose(ema, s.ewm(span=WINDOW, adjust=False).mean(), rtol=1e-12)
+    # Basis = volles Fenster vor dem jeweiligen Wert
+    prev_ma = ref_ma.shift(1)
+    np.testing.assert_allclose([b[0] for b in baselines][WINDOW:], prev_ma[WINDOW:], rtol=1e-12)
+    np.testing.assert_allclose(pcts[WINDOW:], ((s - prev_ma) / prev_ma * 100)[WINDOW:], rtol=1e-6, atol=1e-9)
+    assert pcts[:WINDOW] == [0.0] * WINDOW
+
+
+def test_engine_feeds_only_new_ticks(values):
+    ts = np.arange(len(values), dtype=np.float64)
+    frame = HistoryFrame(ts, values, values, np.ones(len(ts)), np.ones(len(ts)))
+    pushed = []
+    engine = IndicatorEngine()
+    engine.feed("A", "day", "sell", frame.slice(0, 1000), WINDOW)
+    state = engine.feed("A", "day", "sell", frame, WINDOW, on_push=lambda s: pushed.append(s.last_ts))
+    assert pushed == ts[1000:].tolist()
+
+    whole = IndicatorEngine().feed("A", "day", "sell", frame, WINDOW)
+    for got, want in zip(state.series(), whole.series()):
+        np.testing.assert_array_equal(got, want)
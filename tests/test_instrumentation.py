@@ -0,0 +1,20 @@
+from instrumentation import Metrics
+
+
+def _counts(metrics: Metrics) -> dict:
+    return {dict(labels)["page"]: hist.count for (name, labels), hist in metrics.histograms.items()
+            if name == "page_render_seconds"}
+
+
+def test_nested_rerun_counts_only_outer_page():
+    metrics = Metrics()
+    # Voller Rerun: die Karte läuft im Seiten-Timer und zählt nur dort
+    with metrics.rerun("Dashboard"):
+        with metrics.rerun("Dashboard-Karte"):
+            pass
+    assert _counts(metrics) == {"Dashboard": 1}
+
+    # Fragment-Rerun: die Karte läuft allein und wird eigens gemessen
+    with metrics.rerun("Dashboard-Karte"):
+        pass
+    assert _counts(metrics) == {"Dashboard": 1, "Dashboard-Karte": 1}
@@ -0,0 +1,44 @@
+from leaderboard import LeaderboardEngine
+from time_parser import TimeParser
+
+NOW = 1_700_000_000.0
+
+
+class _Orders:
+    """Liefert pro Spieler die jeweils gesetzte Payload (wie der API-Cache)."""
+
+    def __init__(self):
+        self.payloads = {}
+
+    def get_player_orders_many(self, players):
+        return {p: self.payloads.get(p, []) for p in players}
+
+
+def _order(age: float, qty: int, price: float) -> dict:
+    return {"timestamp": TimeParser.from_epoch(NOW - age), "quantity": qty, "price": price}
+
+
+def test_volumes_follow_current_payload():
+    api = _Orders()
+    engine = LeaderboardEngine(api)
+    kept, removed = _order(60, 2, 10.0), _order(120, 3, 17.0)
+    api.payloads["P1"] = [kept, removed, _order(7200, 1, 5.0)]
+    first = engine.volumes(["P1"], now=NOW)
+    assert first.loc["P1", "Volumen"] == 20 + 51 + 5
+    assert first.loc["P1", "Orders"] == 3
+
+    # Zweiter Poll: eine Order storniert, eine neu, der Rest erneut geliefert
+    api.payloads["P1"] = [_order(0, 4, 2.5), kept, _order(7200, 1, 5.0)]
+    second = engine.volumes(["P1"], now=NOW)
+    assert second.loc["P1", "Volumen"] == 10 + 20 + 5
+    assert second.loc["P1", "Orders"] == 3
+
+
+def test_identical_orders_count_separately():
+    api = _Orders()
+    engine = LeaderboardEngine(api)
+    order = _order(60, 1, 100.0)
+    api.payloads["P1"] = [order, dict(order)]
+    assert engine.volumes(["P1"], now=NOW).loc["P1", "Volumen"] == 200
+    api.payloads["P1"] = [dict(order)]
+    assert engine.volumes(["P1"], now=NOW).loc["P1", "Volumen"] == 100
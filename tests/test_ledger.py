@@ -0,0 +1,58 @@
+import pytest
+
+import ledger_db
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = ledger_db.connect(str(tmp_path / "portfolio.db"))
+    yield conn
+    conn.close()
+
+
+def _position(conn, item):
+    return conn.execute(
+        'SELECT quantity, cost, sold_quantity FROM positions WHERE item = ?', (item,)
+    ).fetchone()
+
+
+def test_rebuild_matches_incremental_fifo(conn):
+    ledger_db.record_buy(conn, "A", 5, 10.0, "2024-01-01T00:00:00")
+    ledger_db.record_buy(conn, "A", 5, 20.0, "2024-01-02T00:00:00")
+    ledger_db.record_sale(conn, "A", 7, 30.0, "2024-01-03T00:00:00")
+    before = _position(conn, "A"), conn.execute('SELECT * FROM sale_lots ORDER BY lot_id').fetchall()
+    ledger_db.rebuild_positions(conn, ["A"])
+    after = _position(conn, "A"), conn.execute('SELECT * FROM sale_lots ORDER BY lot_id').fetchall()
+    assert before == after
+    assert after[0] == (3, 60.0, 7)
+
+
+def test_delete_sales_removes_lot_matches(conn):
+    ledger_db.record_buy(conn, "A", 5, 10.0, "2024-01-01T00:00:00")
+    sale = ledger_db.record_sale(conn, "A", 2, 30.0, "2024-01-03T00:00:00")
+    assert ledger_db.delete_sales(conn, [sale]) == 1
+    assert conn.execute('SELECT COUNT(*) FROM sale_lots').fetchone()[0] == 0
+    assert _position(conn, "A") == (5, 50.0, 0)
+
+
+def test_delete_matched_lot_is_refused(conn):
+    lot = ledger_db.record_buy(conn, "A", 5, 10.0, "2024-01-01T00:00:00")
+    spare = ledger_db.record_buy(conn, "A", 5, 20.0, "2024-01-02T00:00:00")
+    ledger_db.record_sale(conn, "A", 2, 30.0, "2024-01-03T00:00:00")
+    with pytest.raises(ValueError):
+        ledger_db.delete_lots(conn, [lot, spare])
+    assert conn.execute('SELECT COUNT(*) FROM portfolio').fetchone()[0] == 2
+    assert ledger_db.delete_lots(conn, [spare]) == 1
+    assert _position(conn, "A") == (3, 30.0, 2)
+
+
+def test_rebuild_refuses_uncovered_sales(conn):
+    ledger_db.record_buy(conn, "A", 1, 10.0, "2024-01-01T00:00:00")
+    with conn:
+        conn.execute(
+            "INSERT INTO sales (item, quantity, sale_price, sale_value, timestamp, cost_basis) "
+            "VALUES ('A', 3, 20.0, 60.0, '2024-01-02T00:00:00', 0)"
+        )
+    with pytest.raises(ValueError):
+        ledger_db.rebuild_positions(conn, ["A"])
+    assert _position(conn, "A") == (1, 10.0, 0)
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+import ledger_db
+import ledger_io
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = ledger_db.connect(str(tmp_path / "portfolio.db"))
+    yield conn
+    conn.close()
+
+
+def _csv(text: str) -> io.StringIO:
+    return io.StringIO(text.strip() + "\n")
+
+
+def test_csv_round_trip(conn, tmp_path):
+    ledger_db.record_buy(conn, "A", 5, 10.0, "2024-01-01T00:00:00.000000")
+    ledger_db.record_buy(conn, "B", 2, 7.5, "2024-01-02T12:30:00.500000")
+    ledger_db.record_sale(conn, "A", 3, 12.0, "2024-01-03T00:00:00.000000")
+    dumps = {}
+    for table, rows in (("portfolio", 2), ("sales", 1)):
+        buf = io.StringIO()
+        assert ledger_io.export_ledger(conn, table, buf) == rows
+        dumps[table] = buf.getvalue()
+
+    other = ledger_db.connect(str(tmp_path / "copy.db"))
+    ledger_io.import_ledger(other, "portfolio", io.StringIO(dumps["portfolio"]))
+    ledger_io.import_ledger(other, "sales", io.StringIO(dumps["sales"]))
+    query = 'SELECT item, quantity, buy_price, timestamp, remaining FROM portfolio ORDER BY id'
+    assert other.execute(query).fetchall() == conn.execute(query).fetchall()
+    query = 'SELECT item, quantity, sale_price, sale_value, timestamp, cost_basis FROM sales ORDER BY id'
+    assert other.execute(query).fetchall() == conn.execute(query).fetchall()
+    query = 'SELECT * FROM positions ORDER BY item'
+    assert other.execute(query).fetchall() == conn.execute(query).fetchall()
+    other.close()
+
+
+def test_mixed_timezones_are_stored_as_utc(conn):
+    ledger_io.import_ledger(conn, "portfolio", _csv("""
+item,quantity,buy_price,timestamp
+A,1,10,2024-01-01T10:00:00Z
+A,1,10,2024-01-01T12:00:00+02:00
+A,1,10,2024-01-01T10:00:00
+"""))
+    stamps = [r[0] for r in conn.execute('SELECT timestamp FROM portfolio')]
+    assert stamps == ["2024-01-01T10:00:00.000000"] * 3
+
+
+def test_oversold_import_is_rejected(conn):
+    ledger_db.record_buy(conn, "A", 2, 10.0, "2024-01-01T00:00:00")
+    with pytest.raises(ValueError):
+        ledger_io.import_ledger(conn, "sales", _csv("""
+item,quantity,sale_price,timestamp
+A,1,40,2024-01-02T00:00:00
+B,1,40,2024-01-02T00:00:00
+"""))
+    # Ganzer Import verworfen, Position unverändert
+    assert conn.execute('SELECT COUNT(*) FROM sales').fetchone()[0] == 0
+    assert conn.execute("SELECT quantity, realized_pnl FROM positions WHERE item = 'A'").fetchone() == (2, 0)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import recommendations
+from history_frame import HistoryFrame
+from history_store import HistoryStore
+from market_scanner import MarketScanner
+from recommendations import Recommendations
+from time_parser import TimeParser
+
+STEP = 300          # Raster der Periode "day"
+T0 = 1_700_000_100  # Vielfaches von STEP
+N = 100
+
+
+def _points(values, start=0):
+    return [{"timestamp": TimeParser.from_epoch(T0 + (start + i) * STEP), "sell": float(v), "buy": float(v)}
+            for i, v in enumerate(values)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db"))
+
+
+def test_scan_ranks_signals_before_watch(store):
+    wave = 100 + 5 * np.sin(np.arange(N) / 7)
+    store.append("FLAT", "day", _points(np.r_[wave, 100]), synced_at=1)
+    # Letzter Kurs weit unter bzw. über allen anderen: deutliche Signale
+    store.append("CHEAP", "day", _points(np.r_[wave, 80]), synced_at=1)
+    store.append("PRICEY", "day", _points(np.r_[wave, 110]), synced_at=1)
+    store.append("DIP", "day", _points(np.r_[wave, 94.9]), synced_at=1)
+    table = MarketScanner(store).scan("day")
+
+    assert list(table.index) == ["CHEAP", "PRICEY", "DIP", "FLAT"]
+    assert list(table["Empfehlung"]) == ["Kaufen", "Verkaufen", "Kaufen", "Beobachten"]
+    # Quantile wie in der Einzelansicht, pro Item
+    for item, last in (("CHEAP", 80), ("FLAT", 100)):
+        series = np.r_[wave, last]
+        assert table.loc[item, "Q5"] == pytest.approx(np.quantile(series, 0.05))
+        assert table.loc[item, "Q95"] == pytest.approx(np.quantile(series, 0.95))
+        assert table.loc[item, "Aktuell"] == last
+    assert table.loc["CHEAP", "Stärke %"] == pytest.approx((table.loc["CHEAP", "Q5"] - 80) / 80 * 100)
+    assert table.loc["FLAT", "Stärke %"] == 0
+    assert len(MarketScanner(store).scan("day", top=2)) == 2
+
+
+def test_scan_picks_up_new_ticks(store):
+    wave = 100 + 5 * np.sin(np.arange(N) / 7)
+    store.append("A", "day", _points(np.r_[wave, 100]), synced_at=1)
+    store.append("B", "day", _points(np.r_[wave, 100]), synced_at=1)
+    scanner = MarketScanner(store)
+    assert set(scanner.scan("day")["Empfehlung"]) == {"Beobachten"}
+
+    # Nur A bekommt einen neuen Tick; B bleibt unverändert im Stand
+    store.append("A", "day", _points([150], start=N + 1), synced_at=2)
+    table = scanner.scan("day")
+    assert table.index[0] == "A" and table.loc["A", "Empfehlung"] == "Verkaufen"
+    assert table.loc["B", "Empfehlung"] == "Beobachten"
+
+
+class _Api:
+    def get_items(self):
+        raise AssertionError("Einzel-Modus darf den Katalog nicht laden")
+
+    def get_history(self, item, period="day"):
+        values = np.r_[np.full(20, 100.0), 90.0]
+        ts = T0 + STEP * np.arange(len(values), dtype=np.float64)
+        return HistoryFrame(ts, values, values, np.ones(len(values)), np.ones(len(values)))
+
+
+def test_single_item_mode_uses_curated_list(monkeypatch):
+    options = []
+
+    def selectbox(label, choices, key=None):
+        options.append(list(choices))
+        return choices[0]
+
+    monkeypatch.setattr(recommendations.st, "selectbox", selectbox)
+    shown = []
+    monkeypatch.setattr(recommendations.st, "markdown", shown.append)
+    page = Recommendations.__new__(Recommendations)     # ohne geteilten Scanner
+    page.api = _Api()
+    page._render_item("day")
+    assert options == [Recommendations.DEFAULT_ITEMS]
+    assert shown == ["**Empfehlung:** Kaufen"]
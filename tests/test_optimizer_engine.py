@@ -0,0 +1,59 @@
+import numpy as np
+
+from optimizer_engine import MeanVarianceEngine, ledoit_wolf, project_simplex
+
+
+def _on_simplex(w: np.ndarray):
+    assert (w >= 0).all()
+    np.testing.assert_allclose(w.sum(axis=-1), 1.0, atol=1e-9)
+
+
+def test_project_simplex_rows():
+    rng = np.random.default_rng(0)
+    w = project_simplex(rng.normal(size=(50, 7)) * 3)
+    _on_simplex(w)
+    # Punkte auf dem Simplex bleiben unverändert
+    inside = rng.dirichlet(np.ones(7), size=5)
+    np.testing.assert_allclose(project_simplex(inside), inside, atol=1e-12)
+
+
+def test_ledoit_wolf_matches_reference():
+    rng = np.random.default_rng(1)
+    returns = rng.normal(size=(40, 6)) @ rng.normal(size=(6, 6))
+    cov, shrink = ledoit_wolf(returns)
+
+    # Referenz: Formel aus Ledoit & Wolf (2004) mit expliziter Schleife über die Beobachtungen
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    s = x.T @ x / t
+    m = np.trace(s) / n
+    d2 = ((s - m * np.eye(n)) ** 2).sum()
+    b2 = sum(((np.outer(row, row) - s) ** 2).sum() for row in x) / t ** 2
+    delta = min(b2, d2) / d2
+    assert 0 <= shrink <= 1
+    assert np.isclose(shrink, delta)
+    np.testing.assert_allclose(cov, delta * m * np.eye(n) + (1 - delta) * s)
+
+
+def test_min_variance_on_diagonal_covariance():
+    # Unkorrelierte Items: Minimum-Varianz-Gewichte sind proportional zu 1/σ²
+    var = np.array([1.0, 2.0, 4.0, 8.0])
+    mu = np.array([0.01, 0.02, 0.03, 0.04])
+    w = MeanVarianceEngine.solve(mu, np.diag(var), [1.0], tol=1e-12)[0]
+    _on_simplex(w)
+    np.testing.assert_allclose(w, (1 / var) / (1 / var).sum(), atol=1e-6)
+
+
+def test_frontier_weights_on_simplex():
+    rng = np.random.default_rng(2)
+    returns = rng.normal(0.001, 0.02, size=(120, 8))
+    engine = MeanVarianceEngine()
+    mu, cov, _ = engine.estimate("k", returns)
+    lams = np.linspace(0, 1, 11)
+    front = engine.frontier("k", mu, cov, lams)
+    assert front.shape == (11, 8)
+    _on_simplex(front)
+    # λ = 0: nur die Rendite zählt, alles ins Item mit dem höchsten μ
+    np.testing.assert_allclose(front[0], np.eye(8)[mu.argmax()], atol=1e-6)
+    # Warm gestartete Einzellösung stimmt mit der Front überein
+    np.testing.assert_allclose(engine.optimize("k", mu, cov, 0.5), front[5], atol=1e-5)
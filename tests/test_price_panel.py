@@ -0,0 +1,69 @@
+import numpy as np
+
+from history_frame import HistoryFrame
+from price_panel import PricePanel
+
+STEP = 300          # Raster der Periode "day"
+T0 = 1_700_000_100  # Vielfaches von STEP
+
+
+class _Histories:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_history_many(self, items, period="day"):
+        return {it: self.frames[it] for it in items}
+
+
+def _frame(ts, sell):
+    ts = np.asarray(ts, dtype=np.float64)
+    sell = np.asarray(sell, dtype=np.float64)
+    ones = np.ones(len(ts))
+    return HistoryFrame(ts, sell, sell, ones, ones)
+
+
+def test_alignment_keeps_last_value_per_cell():
+    frames = {
+        # Zwei Ticks in derselben Zelle: der spätere zählt
+        "A": _frame([T0, T0 + 10, T0 + STEP, T0 + 2 * STEP], [1, 2, 3, 4]),
+        # Versetzt und mit Lücke: wird vorwärts gefüllt
+        "B": _frame([T0 + 5, T0 + 2 * STEP + 5], [10, 30]),
+    }
+    panel = PricePanel(_Histories(frames))
+    grid, values = panel.matrix(["A", "B"], "day")
+    assert grid[-1] == T0 + 2 * STEP
+    np.testing.assert_array_equal(values[-3:], [[2, 10], [3, 10], [4, 30]])
+    assert np.isnan(values[:-3]).all()
+
+
+def test_subset_returns_only_requested_items():
+    frames = {
+        "A": _frame([T0, T0 + STEP], [1, 2]),
+        "B": _frame([T0, T0 + STEP], [5, 6]),
+    }
+    panel = PricePanel(_Histories(frames))
+    assert list(panel.prices(["A", "B"], "day").columns) == ["A", "B"]
+    assert list(panel.prices(["A"], "day").columns) == ["A"]
+    assert panel.cov(["A"], "day").shape == (1, 1)
+
+
+def test_version_ignores_unrelated_items():
+    frames = {
+        "A": _frame([T0, T0 + STEP], [1, 2]),
+        "B": _frame([T0, T0 + STEP], [5, 6]),
+    }
+    panel = PricePanel(_Histories(frames))
+    panel.prices(["A", "B"], "day")
+    before = panel.version(["A"], "day")
+    assert panel.version(["A"], "day") == before
+
+    # Neue Ticks nur bei B: der Stand von A bleibt, der von A+B nicht
+    both = panel.version(["A", "B"], "day")
+    frames["B"] = _frame([T0, T0 + STEP, T0 + 2 * STEP], [5, 6, 7])
+    assert panel.version(["A", "B"], "day") != both
+    assert panel.version(["A"], "day") == before
+
+    # Neue Ticks bei A ändern dessen Stand und werden übernommen
+    frames["A"] = _frame([T0, T0 + STEP, T0 + 2 * STEP], [1, 2, 3])
+    assert panel.version(["A"], "day") != before
+    assert panel.prices(["A"], "day")["A"].iloc[-1] == 3
@@ -1,10 +1,60 @@
-from datetime import datetime, timedelta
+import os
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+# Anzeige-Zeitzone (vorher fest +2 h); per Umgebungsvariable überschreibbar
+TIMEZONE = os.environ.get("BAZAAR_TZ", "Europe/Berlin")
 
 class TimeParser:
+    tz = ZoneInfo(TIMEZONE)
+
     @staticmethod
-    def parse(ts: str) -> datetime:
+    def _parse_utc(ts: str) -> datetime:
         ts = ts.rstrip("Z")
         try:
-            return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S.%f") + timedelta(hours=2)
+            dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S.%f")
         except ValueError:
-            return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S") + timedelta(hours=2)
+            dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S")
+        return dt.replace(tzinfo=timezone.utc)
+
+    @staticmethod
+    def parse(ts: str) -> datetime:
+        """UTC-Zeitstempel der API als lokale (naive) Uhrzeit."""
+        return TimeParser._parse_utc(ts).astimezone(TimeParser.tz).replace(tzinfo=None)
+
+    @staticmethod
+    def parse_many(timestamps) -> pd.DatetimeIndex:
+        """Vektorisierte Variante von ``parse`` für eine ganze Payload.
+
+        Gemischte Formate (mit/ohne Sekundenbruchteile, mit/ohne "Z") werden in
+        einem Durchgang gelesen; ungültige Werte werden zu NaT.
+        """
+        idx = pd.to_datetime(pd.Index(timestamps, dtype=object), utc=True,
+                             format="ISO8601", errors="coerce")
+        return idx.tz_convert(TimeParser.tz).tz_localize(None)
+
+    @staticmethod
+    def from_epoch_many(sec) -> pd.DatetimeIndex:
+        """Unix-Sekunden (UTC) vektorisiert als lokale (naive) Uhrzeit."""
+        idx = pd.to_datetime(np.asarray(sec, dtype=np.float64), unit='s', utc=True)
+        return idx.tz_convert(TimeParser.tz).tz_localize(None)
+
+    @staticmethod
+    def to_epoch(ts: str) -> float:
+        """UTC-Zeitstempel der API als Unix-Sekunden (ohne lokale Verschiebung)."""
+        return TimeParser._parse_utc(ts).timestamp()
+
+    @staticmethod
+    def to_epoch_many(timestamps) -> np.ndarray:
+        """Vektorisierte Variante von ``to_epoch``; ungültige Werte werden zu NaN."""
+        idx = pd.to_datetime(pd.Index(timestamps, dtype=object), utc=True,
+                             format="ISO8601", errors="coerce").as_unit('ns')
+        return np.where(idx.isna(), np.nan, idx.asi8 / 1e9)
+
+    @staticmethod
+    def from_epoch(sec: float) -> str:
+        """Unix-Sekunden zurück in das ISO-Format der API."""
+        return datetime.fromtimestamp(sec, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")